@@ -1,10 +1,12 @@
 import heapq
-import time
 from functools import lru_cache
-from SharedFunctions.shared_functions import visible_count
+from SharedFunctions.board import CompactBoard
+from SharedFunctions.line_kernel import line_visibility
+from SharedFunctions.instrumentation import Instrumentation
+from SharedFunctions.trace import EXPAND
 
 class AStarSolver:
-    def __init__(self, data, weight=2.0):
+    def __init__(self, data, weight=2.0, deadline=None, facts=None, instrumentation=None):
         self.__n = data["n"]
         self.__clues = data["clues"]
         self.__initial_grid = [
@@ -12,20 +14,23 @@ class AStarSolver:
             for row in data.get("grid", [[0] * data["n"] for _ in range(data["n"])])
         ]
 
+        # clue-derived facts become givens, and their domains restrict every cell's candidates
+        self.__cell_masks = [(1 << self.__n) - 1] * (self.__n * self.__n)
+        if facts is not None:
+            for (r, c), v in facts.fixed.items():
+                if not self.__initial_grid[r][c]:
+                    self.__initial_grid[r][c] = v
+            self.__cell_masks = facts.cell_masks()
+
         self.__weight = float(weight)
+        self.__deadline = deadline
 
         self.__full_mask = (1 << self.__n) - 1
         self.__val_to_mask = {v: 1 << (v - 1) for v in range(1, self.__n + 1)}
 
         self.__expanded = 0
         self.__generated = 0
-        self.__start_time = time.time()
-
-    @staticmethod
-    @lru_cache(maxsize=None)
-    def __visible_cached_tuple(seq_tuple):
-        seq = [x for x in seq_tuple if x != 0]
-        return visible_count(seq)
+        self.__inst = instrumentation or Instrumentation()
 
     @lru_cache(maxsize=200000)
     def __heuristic_cached(self, state_key):
@@ -34,62 +39,51 @@ class AStarSolver:
         clues = self.__clues
         h = 0
 
-        flat = list(flat_bytes)
-
-        for r in range(n):
-            row_off = r * n
-            row_vals = tuple(flat[row_off + c] for c in range(n))
-            nonzero = tuple(v for v in row_vals if v != 0)
-            if nonzero and len(nonzero) != len(set(nonzero)):
-                h += 4
-            clue = clues["left"][r]
-            if clue != 0 and nonzero:
-                v = AStarSolver.__visible_cached_tuple(nonzero)
-                empties = n - len(nonzero)
-                if v > clue:
-                    h += 5
-                if v + empties < clue:
-                    h += 5
-            clue = clues["right"][r]
-            if clue != 0 and nonzero:
-                rev = tuple(reversed(nonzero))
-                v = AStarSolver.__visible_cached_tuple(rev)
-                empties = n - len(nonzero)
-                if v > clue:
-                    h += 5
-                if v + empties < clue:
-                    h += 5
+        # rows and columns are bytes slices of the state; empty cells (0) never count as visible
+        lines = [(flat_bytes[r * n:(r + 1) * n], clues["left"][r], clues["right"][r]) for r in range(n)]
+        lines += [(flat_bytes[c::n], clues["top"][c], clues["bottom"][c]) for c in range(n)]
 
-        for c in range(n):
-            col_vals = tuple(flat[c + r * n] for r in range(n))
-            nonzero = tuple(v for v in col_vals if v != 0)
-            if nonzero and len(nonzero) != len(set(nonzero)):
+        for line, clue_front, clue_back in lines:
+            empties = line.count(0)
+            if empties == n:
+                continue
+            if len(set(line)) - (1 if empties else 0) != n - empties:
                 h += 4
-            clue = clues["top"][c]
-            if clue != 0 and nonzero:
-                v = AStarSolver.__visible_cached_tuple(nonzero)
-                empties = n - len(nonzero)
-                if v > clue:
-                    h += 5
-                if v + empties < clue:
-                    h += 5
-            clue = clues["bottom"][c]
-            if clue != 0 and nonzero:
-                rev = tuple(reversed(nonzero))
-                v = AStarSolver.__visible_cached_tuple(rev)
-                empties = n - len(nonzero)
-                if v > clue:
-                    h += 5
-                if v + empties < clue:
-                    h += 5
-
-        total_empty = flat.count(0)
+            front, back = line_visibility(line)
+            for v, clue in ((front, clue_front), (back, clue_back)):
+                if clue != 0:
+                    if v > clue:
+                        h += 5
+                    if v + empties < clue:
+                        h += 5
+
+        total_empty = flat_bytes.count(0)
         if total_empty:
             h += total_empty // max(1, self.__n // 2)
 
         return h
 
     def solve(self):
+        inst = self.__inst
+        inst.start()
+        if inst.trace is not None:
+            inst.trace.start(self.__n, "A*")
+        with inst.phase("initial_propagation"):
+            start, error = self.__initial_state()
+        if error is not None:
+            solution, metrics = None, {"error": error}
+        else:
+            with inst.phase("search"):
+                solution, metrics = self.__search(start)
+
+        with inst.phase("result_formatting"):
+            if solution is not None:
+                solution = CompactBoard(self.__n, solution)
+            inst.set_counters(nodes_expanded=self.__expanded, nodes_generated=self.__generated)
+        inst.stop()
+        return solution, {**metrics, **self.__metrics(solution is not None)}
+
+    def __initial_state(self):
         start_flat = [0] * (self.__n * self.__n)
         row_masks = [0] * self.__n
         col_masks = [0] * self.__n
@@ -106,15 +100,16 @@ class AStarSolver:
         for r in range(self.__n):
             assigned_count = sum(1 for c in range(self.__n) if start_flat[r * self.__n + c] != 0)
             if row_masks[r].bit_count() != assigned_count:
-                return None, {"error": "Invalid initial grid: duplicate in row"}
+                return None, "Invalid initial grid: duplicate in row"
         for c in range(self.__n):
             assigned_count = sum(1 for r in range(self.__n) if start_flat[r * self.__n + c] != 0)
             if col_masks[c].bit_count() != assigned_count:
-                return None, {"error": "Invalid initial grid: duplicate in col"}
+                return None, "Invalid initial grid: duplicate in col"
+
+        return (bytes(start_flat), tuple(row_masks), tuple(col_masks)), None
 
-        start_bytes = bytes(start_flat)
-        row_masks_t = tuple(row_masks)
-        col_masks_t = tuple(col_masks)
+    def __search(self, start):
+        start_bytes, row_masks_t, col_masks_t = start
 
         pq = []
         counter = 0
@@ -127,18 +122,26 @@ class AStarSolver:
         counter += 1
 
         visited = {start_state_key: 0}
+        deadline = self.__deadline
+        trace = self.__inst.trace
 
         while pq:
             f, _, g, flat_bytes, row_masks_t, col_masks_t = heapq.heappop(pq)
             self.__expanded += 1
 
+            if not (self.__expanded & 0x3F):
+                self.__inst.progress(nodes_expanded=self.__expanded, nodes_generated=self.__generated,
+                                     open_list=len(pq))
+                if deadline is not None and deadline.expired():
+                    return None, {"error": deadline.reason(), "timed_out": True}
+
             if self.__is_goal_state(flat_bytes, row_masks_t, col_masks_t):
-                grid = self.__bytes_to_grid(flat_bytes)
-                return self.__grid_to_solution(grid), self.__metrics()
+                return flat_bytes, {}
 
             n = self.__n
             flat = list(flat_bytes)
             full_mask = self.__full_mask
+            cell_masks = self.__cell_masks
             best_r = best_c = -1
             best_mask = None
             best_count = None
@@ -149,7 +152,7 @@ class AStarSolver:
                 for c in range(n):
                     if flat[base + c] == 0:
                         cm = col_masks_t[c]
-                        allowed = full_mask & ~(rm | cm)
+                        allowed = full_mask & ~(rm | cm) & cell_masks[base + c]
                         if allowed == 0:
                             best_count = 0
                             break
@@ -167,6 +170,8 @@ class AStarSolver:
                 continue
             if best_count == 0:
                 continue
+            if trace is not None:
+                trace.record(EXPAND, best_r, best_c, best_count, f, g, (f - g) / self.__weight)
 
             m = best_mask
             candidates = []
@@ -211,12 +216,7 @@ class AStarSolver:
                 counter += 1
                 self.__generated += 1
 
-        return None, {"error": "No solution found", **self.__metrics()}
-
-    def __bytes_to_grid(self, b):
-        n = self.__n
-        flat = list(b)
-        return [flat[i * n:(i + 1) * n] for i in range(n)]
+        return None, {"error": "No solution found"}
 
     def __is_goal_state(self, flat_bytes, row_masks_t, col_masks_t):
         n = self.__n
@@ -237,45 +237,22 @@ class AStarSolver:
     def __check_clues_bytes(self, flat_bytes):
         n = self.__n
         clues = self.__clues
-        flat = list(flat_bytes)
-        vis = AStarSolver.__visible_cached_tuple
-
-        for c, clue in enumerate(clues["top"]):
-            if clue != 0:
-                col = tuple(flat[r * n + c] for r in range(n))
-                if vis(col) != clue:
-                    return False
-
-        for c, clue in enumerate(clues["bottom"]):
-            if clue != 0:
-                col = tuple(flat[r * n + c] for r in reversed(range(n)))
-                if vis(col) != clue:
-                    return False
-
-        for r, clue in enumerate(clues["left"]):
-            if clue != 0:
-                row = tuple(flat[r * n + c] for c in range(n))
-                if vis(row) != clue:
-                    return False
-
-        for r, clue in enumerate(clues["right"]):
-            if clue != 0:
-                row = tuple(flat[r * n + c] for c in reversed(range(n)))
-                if vis(row) != clue:
-                    return False
-        return True
 
-    def __grid_to_solution(self, grid):
-        sol = {}
-        for r in range(self.__n):
-            for c in range(self.__n):
-                sol[(r, c)] = grid[r][c]
-        return sol
+        for c in range(n):
+            front, back = line_visibility(flat_bytes[c::n])
+            if clues["top"][c] not in (0, front) or clues["bottom"][c] not in (0, back):
+                return False
+
+        for r in range(n):
+            front, back = line_visibility(flat_bytes[r * n:(r + 1) * n])
+            if clues["left"][r] not in (0, front) or clues["right"][r] not in (0, back):
+                return False
+        return True
 
-    def __metrics(self):
+    def __metrics(self, success):
         return {
-            "expanded_nodes": self.__expanded,
-            "generated_nodes": self.__generated,
-            "runtime_sec": round(time.time() - self.__start_time, 4),
+            "solver": "A*",
+            "success": success,
+            **self.__inst.metrics(),
             "algorithm": f"A* (w={self.__weight})",
         }
\ No newline at end of file
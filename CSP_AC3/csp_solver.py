@@ -1,23 +1,36 @@
-import time
-import tracemalloc
-import itertools
 from collections import deque
-from SharedFunctions.shared_functions import visible_count
+from SharedFunctions.line_kernel import candidate_lines, line_visibility
+from SharedFunctions.board import CompactBoard
+from SharedFunctions.deadline import DeadlineExceeded
+from SharedFunctions.instrumentation import Instrumentation
+from SharedFunctions.trace import ASSIGN, BACKTRACK, PRUNE
 import copy
 
 class CSPSolver:
-    def __init__(self, puzzle_data):
+    def __init__(self, puzzle_data, deadline=None, facts=None, instrumentation=None, ordering=None):
         self.__n = puzzle_data["n"]
         self.__clues = puzzle_data["clues"]
-        self.__domains = {(r, c): set(range(1, self.__n + 1)) for r in range(self.__n) for c in range(self.__n)}
+        # optional OrderingTable: per-cell value scores replace ascending value order in the search
+        self.__value_scores = ordering.board_scores(self.__n, self.__clues) if ordering is not None else None
+        self.__deadline = deadline
+        self.__inst = instrumentation or Instrumentation()
+        self.__trace = self.__inst.trace
+        self.__facts = facts
+        if facts is not None:
+            self.__domains = {cell: set(values) for cell, values in facts.domains.items()}
+        else:
+            self.__domains = {(r, c): set(range(1, self.__n + 1)) for r in range(self.__n) for c in range(self.__n)}
+        # nonzero givens narrow their cell's domain; a contradicting given leaves it empty
+        for r, row in enumerate(puzzle_data.get("grid", ())):
+            for c, x in enumerate(row):
+                if str(x).isdigit() and int(x):
+                    self.__domains[(r, c)] &= {int(x)}
         self.__assignment = {}
 
-        self.__row_sequences = {r: self.__generate_line_sequences(self.__clues["left"][r],
-                                                                  self.__clues["right"][r]) for r in range(self.__n)}
-        self.__col_sequences = {c: self.__generate_line_sequences(self.__clues["top"][c],
-                                                                  self.__clues["bottom"][c]) for c in range(self.__n)}
-        self.__row_possible = {r: list(self.__row_sequences[r]) for r in range(self.__n)}
-        self.__col_possible = {c: list(self.__col_sequences[c]) for c in range(self.__n)}
+        self.__row_sequences = {}
+        self.__col_sequences = {}
+        self.__row_possible = {}
+        self.__col_possible = {}
 
         self.__backtrack_count = 0
         self.__assignment_attempts = 0
@@ -25,23 +38,22 @@ class CSPSolver:
         self.__ac3_checks = 0
         self.__ac3_prunes = 0
         self.__nodes_expanded = 0
-        self.__runtime = 0
-        self.__memory_peak = 0
 
-    def __generate_line_sequences(self, clue_left, clue_right):
-        seqs = []
-        all_perm = itertools.permutations(range(1, self.__n + 1), self.__n)
-        for p in all_perm:
-            ok = True
-            if clue_left != "":
-                if visible_count(list(p)) != int(clue_left):
-                    ok = False
-            if ok and clue_right != "":
-                if visible_count(list(p[::-1])) != int(clue_right):
-                    ok = False
-            if ok:
-                seqs.append(tuple(p))
-        return seqs
+    def __prepare_lines(self):
+        n = self.__n
+        clues = self.__clues
+        deadline = self.__deadline
+        if self.__facts is not None and self.__facts.lines is not None:
+            # already filtered and propagated by a SolverSession
+            self.__row_sequences = self.__facts.lines["row"]
+            self.__col_sequences = self.__facts.lines["col"]
+        else:
+            self.__row_sequences = {r: candidate_lines(n, clues["left"][r], clues["right"][r], deadline)
+                                    for r in range(n)}
+            self.__col_sequences = {c: candidate_lines(n, clues["top"][c], clues["bottom"][c], deadline)
+                                    for c in range(n)}
+        self.__row_possible = {r: list(self.__row_sequences[r]) for r in range(n)}
+        self.__col_possible = {c: list(self.__col_sequences[c]) for c in range(n)}
 
     def __filter_row_possible(self, r):
         filtered = []
@@ -89,10 +101,13 @@ class CSPSolver:
                 to_remove.add(vi)
 
         if to_remove:
+            trace = self.__trace
             for v in to_remove:
                 if v in self.__domains[xi]:
                     self.__domains[xi].remove(v)
                     self.__ac3_prunes += 1
+                    if trace is not None:
+                        trace.record(PRUNE, r, c, v, len(self.__assignment))
             revised = True
             self.__ac3_reductions += 1
 
@@ -100,7 +115,14 @@ class CSPSolver:
 
     def __ac3(self):
         queue = deque([(r, c) for r in range(self.__n) for c in range(self.__n)])
+        deadline = self.__deadline
+        pops = 0
         while queue:
+            pops += 1
+            if not (pops & 0x3F):
+                self.__inst.progress(ac3_checks=self.__ac3_checks, ac3_prunes=self.__ac3_prunes)
+                if deadline is not None:
+                    deadline.check()
             xi = queue.popleft()
             if self.__revise(xi):
                 if not self.__domains[xi]:
@@ -132,18 +154,20 @@ class CSPSolver:
         if all(v is not None for v in row_vals):
             left = self.__clues["left"][r]
             right = self.__clues["right"][r]
-            if left != "" and visible_count(row_vals) != int(left):
+            front, back = line_visibility(row_vals)
+            if left != "" and front != int(left):
                 return False
-            if right != "" and visible_count(row_vals[::-1]) != int(right):
+            if right != "" and back != int(right):
                 return False
 
         col_vals = [temp_assignment.get((i, c)) for i in range(self.__n)]
         if all(v is not None for v in col_vals):
             top = self.__clues["top"][c]
             bottom = self.__clues["bottom"][c]
-            if top != "" and visible_count(col_vals) != int(top):
+            front, back = line_visibility(col_vals)
+            if top != "" and front != int(top):
                 return False
-            if bottom != "" and visible_count(col_vals[::-1]) != int(bottom):
+            if bottom != "" and back != int(bottom):
                 return False
 
         if value not in self.__domains[var]:
@@ -153,8 +177,13 @@ class CSPSolver:
 
     def __backtrack(self):
         self.__nodes_expanded += 1
+        if not (self.__nodes_expanded & 0xFF):
+            self.__inst.progress(nodes_expanded=self.__nodes_expanded, nodes_generated=self.__assignment_attempts,
+                                 backtracks=self.__backtrack_count)
+            if self.__deadline is not None:
+                self.__deadline.check()
         if len(self.__assignment) == self.__n * self.__n:
-            return dict(self.__assignment)
+            return CompactBoard.from_dict(self.__n, self.__assignment)
 
         unassigned = [v for v in self.__domains if v not in self.__assignment]
         var = min(unassigned, key=lambda v: (len(self.__domains[v]), -len(self.__get_neighbors(v))))
@@ -163,11 +192,18 @@ class CSPSolver:
         row_possible_snapshot = copy.deepcopy(self.__row_possible)
         col_possible_snapshot = copy.deepcopy(self.__col_possible)
 
-        for value in sorted(self.__domains[var]):
+        if self.__value_scores is None:
+            values = sorted(self.__domains[var])
+        else:
+            scores = self.__value_scores[var]
+            values = sorted(self.__domains[var], key=lambda v: (-scores[v - 1], v))
+        for value in values:
             self.__assignment_attempts += 1
             if self.__consistent(var, value):
                 self.__assignment[var] = value
                 self.__domains[var] = {value}
+                if self.__trace is not None:
+                    self.__trace.record(ASSIGN, var[0], var[1], value, len(self.__assignment))
 
                 ac3_ok = self.__ac3()
                 if ac3_ok:
@@ -176,6 +212,8 @@ class CSPSolver:
                         return result
 
                 self.__backtrack_count += 1
+                if self.__trace is not None:
+                    self.__trace.record(BACKTRACK, var[0], var[1], value, len(self.__assignment))
                 self.__domains = copy.deepcopy(domain_snapshot)
                 self.__row_possible = copy.deepcopy(row_possible_snapshot)
                 self.__col_possible = copy.deepcopy(col_possible_snapshot)
@@ -187,28 +225,40 @@ class CSPSolver:
         return None
 
     @staticmethod
-    def solve(puzzle_data):
-        solver = CSPSolver(puzzle_data)
-        tracemalloc.start()
-        start_time = time.time()
-
-        solver.__ac3()
-        result = solver.__backtrack()
-
-        solver.__runtime = time.time() - start_time
-        _, peak = tracemalloc.get_traced_memory()
-        solver.__memory_peak = peak
-        tracemalloc.stop()
-
-        metrics = {
-            "runtime_sec": round(solver.__runtime, 4),
-            "backtracks": solver.__backtrack_count,
-            "assignments_attempted": solver.__assignment_attempts,
-            "nodes_expanded": solver.__nodes_expanded,
-            "ac3_checks": solver.__ac3_checks,
-            "ac3_prunes": solver.__ac3_prunes,
-            "ac3_reductions": solver.__ac3_reductions,
-            "memory_peak_bytes": solver.__memory_peak
-        }
-
-        return result, metrics
\ No newline at end of file
+    def solve(puzzle_data, deadline=None, facts=None, instrumentation=None, ordering=None):
+        inst = instrumentation or Instrumentation()
+        solver = CSPSolver(puzzle_data, deadline, facts, inst, ordering)
+        error = None
+        result = None
+
+        inst.start()
+        if inst.trace is not None:
+            inst.trace.start(solver.__n, "CSP")
+        try:
+            with inst.phase("line_generation"):
+                solver.__prepare_lines()
+            with inst.phase("initial_propagation"):
+                consistent = all(solver.__domains.values()) and solver.__ac3()
+            if consistent:
+                with inst.phase("search"):
+                    result = solver.__backtrack()
+        except DeadlineExceeded as e:
+            error = str(e)
+
+        with inst.phase("result_formatting"):
+            inst.set_counters(
+                nodes_expanded=solver.__nodes_expanded,
+                nodes_generated=solver.__assignment_attempts,
+                backtracks=solver.__backtrack_count,
+                assignments_attempted=solver.__assignment_attempts,
+                ac3_checks=solver.__ac3_checks,
+                ac3_prunes=solver.__ac3_prunes,
+                ac3_reductions=solver.__ac3_reductions,
+            )
+        inst.stop()
+        metrics = {"solver": "CSP", "success": result is not None, **inst.metrics()}
+
+        if error is not None:
+            return None, {"error": error, "timed_out": True, **metrics}
+
+        return result, metrics
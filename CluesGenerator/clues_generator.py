@@ -1,9 +1,11 @@
 import random
-from SharedFunctions.shared_functions import visible_count
+from SharedFunctions.line_kernel import line_visibility
 
 class RandomPuzzleGenerator:
-    def __init__(self, n: int):
+    def __init__(self, n: int, seed=None):
         self.n = n
+        # a seeded generator yields a reproducible sequence of puzzles; otherwise use the global RNG
+        self.__rng = random.Random(seed) if seed is not None else random
 
     def __generate_latin_square(self):
         n = self.n
@@ -13,15 +15,15 @@ class RandomPuzzleGenerator:
         n = self.n
 
         rows = list(range(n))
-        random.shuffle(rows)
+        self.__rng.shuffle(rows)
         grid = [grid[r] for r in rows]
 
         cols = list(range(n))
-        random.shuffle(cols)
+        self.__rng.shuffle(cols)
         grid = [[row[c] for c in cols] for row in grid]
 
         symbols = list(range(1, n + 1))
-        random.shuffle(symbols)
+        self.__rng.shuffle(symbols)
         mapping = {old: new for old, new in zip(range(1, n + 1), symbols)}
 
         grid = [[mapping[value] for value in row] for row in grid]
@@ -37,14 +39,14 @@ class RandomPuzzleGenerator:
         right = []
 
         for c in range(n):
-            col = [grid[r][c] for r in range(n)]
-            top.append(visible_count(col))
-            bottom.append(visible_count(col[::-1]))
+            front, back = line_visibility([grid[r][c] for r in range(n)])
+            top.append(front)
+            bottom.append(back)
 
         for r in range(n):
-            row = grid[r]
-            left.append(visible_count(row))
-            right.append(visible_count(row[::-1]))
+            front, back = line_visibility(grid[r])
+            left.append(front)
+            right.append(back)
 
         return {
             "top": top,
@@ -54,7 +56,11 @@ class RandomPuzzleGenerator:
         }
 
     def generate(self):
+        clues, _ = self.generate_with_solution()
+        return clues
+
+    def generate_with_solution(self):
         latin = self.__generate_latin_square()
         grid = self.__randomize_latin_square(latin)
         clues = self.__compute_clues(grid)
-        return clues
\ No newline at end of file
+        return clues, grid
\ No newline at end of file
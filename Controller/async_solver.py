@@ -0,0 +1,161 @@
+import asyncio
+import concurrent.futures
+import multiprocessing as mp
+import os
+import threading
+from collections import deque
+
+from Controller.data_checking import validate_puzzle
+from Controller.solvers import solve_puzzle
+from SharedFunctions.deadline import Deadline
+
+# cancellation flags shared with the worker processes, one slot per in-flight solve
+_CANCEL_FLAGS = None
+
+
+def _init_worker(flags):
+    global _CANCEL_FLAGS
+    _CANCEL_FLAGS = flags
+
+
+class _SlotFlag:
+    def __init__(self, flags, slot):
+        self.__flags = flags
+        self.__slot = slot
+
+    def is_set(self):
+        return self.__flags[self.__slot] != 0
+
+    def set(self):
+        self.__flags[self.__slot] = 1
+
+    def clear(self):
+        self.__flags[self.__slot] = 0
+
+
+def _solve_in_slot(data, algorithm, timeout, slot, use_preprocessing, trace_memory=False, ordering=None):
+    error = validate_puzzle(data)
+    if error is not None:
+        return None, {"error": error}
+    deadline = Deadline(timeout, _SlotFlag(_CANCEL_FLAGS, slot))
+    return solve_puzzle(data, algorithm, deadline, use_preprocessing=use_preprocessing, trace_memory=trace_memory,
+                        ordering=ordering)
+
+
+class AsyncSolverPool:
+    """
+    Process pool behind `PuzzleManager.solve_async`. At most `max_concurrency` solves are in flight;
+    up to `max_pending` further callers wait for a slot and anything beyond that is rejected.
+    The limit holds across event loops: waiters from any loop queue for the same slots in FIFO order.
+    Cancelling the awaiting asyncio task raises the solve's cancellation flag in the worker.
+    `ordering` may be an OrderingTable or its path.
+    """
+
+    def __init__(self, workers=None, max_concurrency=None, max_pending=1000):
+        self.__workers = workers or os.cpu_count() or 1
+        self.__max_concurrency = max_concurrency or self.__workers
+        self.__max_pending = max_pending
+        self.__flags = mp.Array("b", self.__max_concurrency, lock=False)
+        self.__free_slots = list(range(self.__max_concurrency))
+        self.__executor = None
+        self.__lock = threading.Lock()
+        # (loop, future) per caller waiting for a slot; a freed slot is handed to the oldest one
+        self.__waiters = deque()
+
+    def __get_executor(self):
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.__workers, initializer=_init_worker, initargs=(self.__flags,))
+            return self.__executor
+
+    async def __acquire_slot(self):
+        """A free slot, waiting for one if needed; None when too many callers are already waiting."""
+        loop = asyncio.get_running_loop()
+        with self.__lock:
+            if self.__free_slots:
+                return self.__free_slots.pop()
+            if len(self.__waiters) >= self.__max_pending:
+                return None
+            waiter = loop.create_future()
+            self.__waiters.append((loop, waiter))
+
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            with self.__lock:
+                if (loop, waiter) in self.__waiters:
+                    self.__waiters.remove((loop, waiter))
+            if waiter.done() and not waiter.cancelled():
+                # the slot arrived just as the caller gave up
+                self.__release_slot(waiter.result())
+            raise
+
+    def __release_slot(self, slot):
+        # called from any thread; the waiter's own loop completes its future
+        with self.__lock:
+            while self.__waiters:
+                loop, waiter = self.__waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self.__deliver, waiter, slot)
+                    return
+                except RuntimeError:
+                    # that loop is closed; try the next waiter
+                    continue
+            self.__free_slots.append(slot)
+
+    def __deliver(self, waiter, slot):
+        if waiter.done():
+            self.__release_slot(slot)
+        else:
+            waiter.set_result(slot)
+
+    async def solve(self, data, algorithm, timeout=None, use_preprocessing=True, trace_memory=False, ordering=None):
+        slot = await self.__acquire_slot()
+        if slot is None:
+            return None, {"error": "Solver pool is busy: too many pending solves", "rejected": True}
+
+        flag = _SlotFlag(self.__flags, slot)
+        flag.clear()
+
+        def release(_):
+            # runs on the executor's thread once the worker has really finished with the slot
+            self.__release_slot(slot)
+
+        try:
+            # a mapped OrderingTable does not pickle; the worker maps the same file from its path
+            future = self.__get_executor().submit(_solve_in_slot, data, algorithm, timeout, slot, use_preprocessing,
+                                                  trace_memory, getattr(ordering, "path", ordering))
+        except BaseException:
+            release(None)
+            raise
+        future.add_done_callback(release)
+
+        try:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except asyncio.CancelledError:
+            # under the lock release() cannot hand the slot on, so a finished solve's slot is never flagged
+            if not future.cancel():
+                with self.__lock:
+                    if not future.done():
+                        flag.set()
+            raise
+
+    def shutdown(self, wait=True):
+        """Stop the workers; wait=False only for callers that cannot block, as the pool may not exit cleanly."""
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_DEFAULT_POOL = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+
+def get_async_pool():
+    global _DEFAULT_POOL
+    with _DEFAULT_POOL_LOCK:
+        if _DEFAULT_POOL is None:
+            _DEFAULT_POOL = AsyncSolverPool()
+        return _DEFAULT_POOL
@@ -0,0 +1,59 @@
+import concurrent.futures
+import os
+import threading
+
+# solves from every caller (e.g. all Streamlit sessions) share one bounded thread pool
+MAX_BACKGROUND_SOLVES = max(2, os.cpu_count() or 1)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_BACKGROUND_SOLVES,
+                                                              thread_name_prefix="background-solve")
+        return _executor
+
+
+class BackgroundSolve:
+    """
+    Handle to a solve running on the shared background pool. The solver's Deadline is the
+    cancellation channel and its Instrumentation the source of live progress snapshots.
+    """
+
+    def __init__(self, solve, deadline, instrumentation):
+        self.__deadline = deadline
+        self.__instrumentation = instrumentation
+        self.__future = _get_executor().submit(solve)
+
+    def done(self):
+        return self.__future.done()
+
+    def cancel(self):
+        # a queued solve never starts; a running one stops at its next deadline check
+        self.__future.cancel()
+        self.__deadline.cancel()
+
+    @property
+    def cancelled(self):
+        return self.__deadline.cancelled()
+
+    def progress(self):
+        if self.__future.done():
+            state = "done"
+        else:
+            state = "running" if self.__future.running() else "queued"
+        return {"state": state, **self.__instrumentation.snapshot()}
+
+    def result(self, timeout=None):
+        if self.__future.cancelled():
+            return None, {"error": self.__deadline.reason(), "timed_out": True}
+        try:
+            return self.__future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise
+        except Exception as e:
+            return None, {"error": str(e)}
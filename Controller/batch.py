@@ -0,0 +1,207 @@
+import atexit
+import concurrent.futures
+import itertools
+import os
+import threading
+import time
+from statistics import mean, median
+
+from Controller.data_checking import validate_puzzle
+from Controller.solvers import solve_puzzle
+from SharedFunctions.deadline import Deadline
+from SharedFunctions.shared_puzzles import SharedPuzzleBuffer, attach, share_tracker
+
+# long-lived worker pools keyed by size, shared by every batch in this process
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _solve_chunk(chunk, algorithm, timeout, phase_timers=True, ordering=None):
+    solved = []
+    for index, data in chunk:
+        # one bad puzzle must not fail the chunk: the parent would lose every result in it
+        try:
+            error = validate_puzzle(data)
+            if error is not None:
+                solved.append((index, None, {"error": error}))
+                continue
+            result, metrics = solve_puzzle(data, algorithm, Deadline(timeout), phase_timers=phase_timers,
+                                           ordering=ordering)
+        except Exception as e:
+            result, metrics = None, {"error": str(e)}
+        solved.append((index, result, metrics))
+    return solved
+
+
+def _solve_shared_chunk(name, capacity, slots, algorithm, timeout, phase_timers=True, ordering=None):
+    """_solve_chunk for puzzles packed in a SharedPuzzleBuffer: solutions go back into their slots."""
+    shared = attach(name, capacity)
+    metrics_list = []
+    for slot in slots:
+        try:
+            result, metrics = solve_puzzle(shared.puzzle(slot), algorithm, Deadline(timeout), phase_timers=phase_timers,
+                                           ordering=ordering)
+        except Exception as e:
+            result, metrics = None, {"error": str(e)}
+        shared.store(slot, result)
+        metrics_list.append(metrics)
+    return metrics_list
+
+
+def get_pool(workers=None):
+    workers = workers or os.cpu_count() or 1
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            # workers are shared by every batch, so they may later attach to a SharedPuzzleBuffer
+            share_tracker()
+            pool = _POOLS[workers] = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        return pool, workers
+
+
+def shutdown_pools():
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _POOLS.clear()
+
+
+atexit.register(shutdown_pools)
+
+
+class BatchRun:
+    """
+    Iterator over (index, result, metrics) for a stream of puzzles, yielded in completion order.
+    Puzzles are read lazily and sent to a persistent process pool in chunks, with a bounded
+    number of chunks in flight, so memory stays constant for arbitrarily long inputs. With
+    shared_memory=True every chunk in flight owns a range of a SharedPuzzleBuffer: puzzles are
+    validated and packed here, workers write solutions back in place and return only metrics.
+    `ordering` is the path of an OrderingTable; each worker maps the file once and keeps it.
+    """
+
+    def __init__(self, puzzles, algorithm, workers=None, timeout=180, chunk_size=8, max_in_flight=None,
+                 phase_timers=True, shared_memory=False, ordering=None):
+        self.__puzzles = puzzles
+        self.__algorithm = algorithm
+        self.__workers = workers
+        self.__timeout = timeout
+        self.__chunk_size = max(1, chunk_size)
+        self.__max_in_flight = max_in_flight
+        self.__phase_timers = phase_timers
+        self.__shared_memory = shared_memory
+        self.__ordering = ordering
+
+        self.__completed = 0
+        self.__solved = 0
+        self.__timed_out = 0
+        self.__runtimes = []
+        self.__start = None
+        self.__end = None
+
+    def __iter__(self):
+        pool, workers = get_pool(self.__workers)
+        max_in_flight = self.__max_in_flight or 2 * workers
+        chunk_size = self.__chunk_size
+        source = enumerate(self.__puzzles)
+        in_flight = set()
+        shared = SharedPuzzleBuffer(max_in_flight * chunk_size) if self.__shared_memory else None
+        # shared memory path: free slot ranges, each chunk's (start, [(index, slot)]) and the puzzles that never left
+        free = list(range(0, max_in_flight * chunk_size, chunk_size))
+        ranges = {}
+        rejected = []
+        self.__start = time.perf_counter()
+
+        def submit_next():
+            chunk = list(itertools.islice(source, chunk_size))
+            if not chunk:
+                return False
+            if shared is None:
+                in_flight.add(pool.submit(_solve_chunk, chunk, self.__algorithm, self.__timeout, self.__phase_timers,
+                                          self.__ordering))
+                return True
+
+            start = free.pop()
+            slots = []
+            for offset, (index, data) in enumerate(chunk):
+                # guarded like _solve_chunk: a bad puzzle becomes an error record, never an exception in the stream
+                try:
+                    error = validate_puzzle(data)
+                    if error is None and not SharedPuzzleBuffer.fits(data):
+                        error = "Invalid puzzle: does not fit a shared-memory slot"
+                    if error is None:
+                        shared.pack(start + offset, data)
+                except Exception as e:
+                    error = str(e)
+                if error is not None:
+                    rejected.append((index, None, {"error": error}))
+                    continue
+                slots.append((index, start + offset))
+            future = pool.submit(_solve_shared_chunk, shared.name, shared.capacity, [slot for _, slot in slots],
+                                 self.__algorithm, self.__timeout, self.__phase_timers, self.__ordering)
+            ranges[future] = (start, slots)
+            in_flight.add(future)
+            return True
+
+        def collect(future):
+            if shared is None:
+                return future.result()
+            start, slots = ranges.pop(future)
+            # read the boards before the range is handed to the next chunk
+            solved = [(index, shared.solution(slot), metrics)
+                      for (index, slot), metrics in zip(slots, future.result())]
+            free.append(start)
+            return solved
+
+        try:
+            while len(in_flight) < max_in_flight and submit_next():
+                pass
+
+            while in_flight or rejected:
+                while rejected:
+                    index, result, metrics = rejected.pop()
+                    self.__record(result, metrics)
+                    yield index, result, metrics
+                if not in_flight:
+                    break
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    solved = collect(future)
+                    submit_next()
+                    for index, result, metrics in solved:
+                        self.__record(result, metrics)
+                        yield index, result, metrics
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if shared is not None:
+                # a chunk still running keeps its own mapping; unlinking only removes the name
+                shared.close()
+            self.__end = time.perf_counter()
+
+    def __record(self, result, metrics):
+        self.__completed += 1
+        if result is not None:
+            self.__solved += 1
+        if isinstance(metrics, dict):
+            if metrics.get("timed_out"):
+                self.__timed_out += 1
+            if "runtime_sec" in metrics:
+                self.__runtimes.append(metrics["runtime_sec"])
+
+    def summary(self):
+        if self.__start is None:
+            return {"puzzles": 0}
+
+        end = self.__end if self.__end is not None else time.perf_counter()
+        wall = end - self.__start
+        return {
+            "puzzles": self.__completed,
+            "solved": self.__solved,
+            "failed": self.__completed - self.__solved,
+            "timed_out": self.__timed_out,
+            "wall_sec": round(wall, 4),
+            "puzzles_per_sec": round(self.__completed / wall, 2) if wall > 0 else None,
+            "solver_sec_mean": round(mean(self.__runtimes), 4) if self.__runtimes else None,
+            "solver_sec_median": round(median(self.__runtimes), 4) if self.__runtimes else None,
+        }
@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import sys
+
+from Controller.batch import BatchRun
+from SharedFunctions.board import as_board
+
+ALGORITHM_CHOICES = ("CSP", "A*", "HillClimb", "DLX", "LNS", "portfolio")
+DIRECTIONS = ("top", "bottom", "left", "right")
+
+
+def _solution_rows(n, solution):
+    if solution is None:
+        return None
+    return as_board(n, solution).to_grid()
+
+
+def _read_puzzles(stream, pending, write):
+    """
+    Lazily parse JSON Lines. Only puzzles that are currently in flight are remembered
+    (keyed by the index BatchRun assigns them), so memory stays constant however long the input is.
+    Malformed lines are written out as error records as soon as they are read.
+    """
+    index = 0
+    for line_no, line in enumerate(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            puzzle = json.loads(line)
+            data = {"n": int(puzzle["n"]), "clues": puzzle["clues"]}
+            if not isinstance(data["clues"], dict):
+                raise ValueError("clues must be an object with top, bottom, left and right")
+            for direction in DIRECTIONS:
+                clues = data["clues"].get(direction)
+                if not isinstance(clues, list) or len(clues) != data["n"]:
+                    raise ValueError(f"clues[{direction!r}] must be a list of {data['n']} values")
+            if "grid" in puzzle:
+                data["grid"] = puzzle["grid"]
+        except (ValueError, KeyError, TypeError) as e:
+            write({"line": line_no + 1, "id": None, "solution": None, "metrics": {"error": f"Bad input: {e}"}})
+            continue
+        pending[index] = (line_no + 1, puzzle.get("id"), data["n"])
+        index += 1
+        yield data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py solve",
+                                     description="Solve puzzles from JSON Lines and stream results as they finish")
+    parser.add_argument("input", nargs="?", default="-", help="JSON Lines file, or - for stdin (default)")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("-a", "--algorithm", default="CSP", choices=ALGORITHM_CHOICES)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("-t", "--timeout", type=float, default=180, help="per-puzzle timeout in seconds")
+    parser.add_argument("--chunk-size", type=int, default=8)
+    parser.add_argument("--no-phase-timers", action="store_true",
+                        help="skip per-phase timings; metrics keep runtime and counters only")
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="send puzzles and boards to the workers through shared memory instead of pickles")
+    parser.add_argument("--ordering", metavar="PATH", default=None,
+                        help="value-ordering table for CSP (see Evaluations/ordering_benchmark.py)")
+    parser.add_argument("--summary", action="store_true", help="print throughput statistics to stderr")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    def write(record):
+        sink.write(json.dumps(record, default=str) + "\n")
+        sink.flush()
+
+    pending = {}
+    puzzles = _read_puzzles(source, pending, write)
+    run = BatchRun(puzzles, args.algorithm, workers=args.workers, timeout=args.timeout, chunk_size=args.chunk_size,
+                   phase_timers=not args.no_phase_timers, shared_memory=args.shared_memory,
+                   ordering=args.ordering)
+
+    try:
+        for index, result, metrics in run:
+            line_no, puzzle_id, n = pending.pop(index)
+            write({"line": line_no, "id": puzzle_id, "solution": _solution_rows(n, result), "metrics": metrics})
+    except BrokenPipeError:
+        # downstream consumer (e.g. `head`) went away; stop quietly
+        if sink is sys.stdout:
+            sys.stdout = open(os.devnull, "w")
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    if args.summary:
+        print(json.dumps(run.summary()), file=sys.stderr)
+    return 0
@@ -47,4 +47,16 @@ class DataChecker:
                     (self.__clues[dir1][i] + self.__clues[dir2][i] > self.__n + 1)):
                 return False
 
-        return True
\ No newline at end of file
+        return True
+
+def validate_puzzle(data: dict):
+    try:
+        checker = DataChecker(data)
+        if not checker.general_check():
+            return "Invalid puzzle: clues are inconsistent or out of range"
+    except ValueError as e:
+        return str(e)
+    except (KeyError, TypeError, AttributeError) as e:
+        # missing clue directions or non-list clues
+        return f"Invalid puzzle: malformed clues ({type(e).__name__}: {e})"
+    return None
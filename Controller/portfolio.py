@@ -0,0 +1,204 @@
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+
+from Controller.solvers import run_solver
+from SharedFunctions.deadline import Deadline
+from SharedFunctions.shared_functions import verify_solution
+
+PORTFOLIO_ALGORITHMS = ("CSP", "A*", "HillClimb")
+
+
+def _portfolio_worker(data, algorithm, timeout, stop_event, results, facts=None):
+    deadline = Deadline(timeout, stop_event)
+    start = time.perf_counter()
+    try:
+        result, metrics = run_solver(data, algorithm, deadline, facts)
+    except Exception as e:
+        result, metrics = None, {"error": str(e)}
+    results.put((algorithm, result, metrics, time.perf_counter() - start))
+
+
+class PortfolioHistory:
+    """
+    Per-board-size record of which portfolio member won and how fast.
+    Used to launch the most promising solver first when there are fewer cores than solvers.
+    Optionally persisted as JSON at `path`.
+    """
+
+    def __init__(self, path=None):
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__stats = {}
+
+        if path is not None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.__stats = json.load(f)
+
+    def ordering(self, n, algorithms):
+        per_n = self.__stats.get(str(n), {})
+
+        def rank(algorithm):
+            entry = per_n.get(algorithm)
+            if not entry or not entry["runs"]:
+                # unknown solvers keep their default position behind proven winners
+                return 0.0, float("inf")
+            win_rate = entry["wins"] / entry["runs"]
+            mean_win = entry["win_time"] / entry["wins"] if entry["wins"] else float("inf")
+            return -win_rate, mean_win
+
+        return sorted(algorithms, key=rank)
+
+    def record(self, n, winner, elapsed, participants):
+        with self.__lock:
+            per_n = self.__stats.setdefault(str(n), {})
+            for algorithm in participants:
+                entry = per_n.setdefault(algorithm, {"runs": 0, "wins": 0, "win_time": 0.0})
+                entry["runs"] += 1
+                if algorithm == winner:
+                    entry["wins"] += 1
+                    entry["win_time"] += elapsed
+            self.__save()
+
+    def __save(self):
+        if self.__path is None:
+            return
+        tmp = f"{self.__path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.__stats, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.__path)
+
+
+class PortfolioSolver:
+    """
+    Races several solvers on the same puzzle in separate processes and returns the first
+    verified solution; the remaining solvers are cancelled and killed.
+    """
+
+    def __init__(self, data, algorithms=PORTFOLIO_ALGORITHMS, history=None, max_parallel=None, facts=None):
+        self.__data = data
+        self.__facts = facts
+        self.__n = data["n"]
+        self.__history = history
+        self.__algorithms = list(algorithms)
+        if history is not None:
+            self.__algorithms = history.ordering(self.__n, self.__algorithms)
+
+        cores = os.cpu_count() or 1
+        self.__max_parallel = max(1, min(len(self.__algorithms), max_parallel or cores))
+
+    def solve(self, deadline=None):
+        deadline = deadline or Deadline()
+        start = time.perf_counter()
+        stop_event = mp.Event()
+        results = mp.Queue()
+
+        pending = list(self.__algorithms)
+        running = {}
+        outcomes = {algorithm: "not_started" for algorithm in pending}
+        finish_times = {}
+        launch_times = {}
+        cutoff = None
+        winner = None
+        winner_result = None
+        winner_metrics = None
+
+        def launch():
+            algorithm = pending.pop(0)
+            p = mp.Process(target=_portfolio_worker,
+                           args=(self.__data, algorithm, deadline.remaining(), stop_event, results, self.__facts),
+                           daemon=True)
+            p.start()
+            launch_times[algorithm] = time.perf_counter()
+            running[algorithm] = p
+            outcomes[algorithm] = "running"
+
+        try:
+            while pending and len(running) < self.__max_parallel:
+                launch()
+
+            while running and winner is None:
+                if deadline.expired():
+                    break
+                try:
+                    algorithm, result, metrics, elapsed = results.get(timeout=0.05)
+                except queue.Empty:
+                    for algorithm, p in list(running.items()):
+                        if not p.is_alive() and p.exitcode != 0:
+                            # crashed without reporting back
+                            outcomes[algorithm] = "crashed"
+                            running.pop(algorithm).join()
+                            if pending:
+                                launch()
+                    continue
+
+                running.pop(algorithm).join()
+                finish_times[algorithm] = elapsed
+
+                if result is not None and verify_solution(self.__n, self.__data["clues"], result):
+                    outcomes[algorithm] = "won"
+                    winner, winner_result, winner_metrics = algorithm, result, metrics
+                    cutoff = time.perf_counter()
+                else:
+                    outcomes[algorithm] = "failed"
+                    if pending:
+                        launch()
+
+            stop_event.set()
+            # pick up solvers that finished in the same instant, to measure the winning margin
+            while True:
+                try:
+                    algorithm, result, metrics, elapsed = results.get_nowait()
+                except queue.Empty:
+                    break
+                finish_times[algorithm] = elapsed
+                if algorithm in running:
+                    running.pop(algorithm).join()
+                solved = result is not None and verify_solution(self.__n, self.__data["clues"], result)
+                outcomes[algorithm] = "solved_late" if solved else "failed"
+        finally:
+            stop_event.set()
+            for algorithm, p in running.items():
+                p.kill()
+                p.join()
+                if outcomes[algorithm] == "running":
+                    outcomes[algorithm] = "cancelled"
+            results.close()
+            results.join_thread()
+
+        wall = time.perf_counter() - start
+        metrics = {
+            "runtime_sec": round(wall, 4),
+            "portfolio_winner": winner,
+            "portfolio_order": list(self.__algorithms),
+            "portfolio_parallel": self.__max_parallel,
+            "portfolio_outcomes": outcomes,
+        }
+
+        if winner is None:
+            error = deadline.reason() if deadline.expired() else "No solver found a solution"
+            return None, {"error": error, "timed_out": deadline.expired(), **metrics}
+
+        late = [finish_times[a] for a, o in outcomes.items() if o == "solved_late"]
+        # a cancelled solver had been running this long when the winner came in, so it needed at least as much;
+        # both sides are measured from launch in this process, so process start-up cancels out
+        winner_wall = cutoff - launch_times[winner]
+        cancelled = {a: cutoff - launch_times[a] for a, o in outcomes.items() if o == "cancelled"}
+        bounds = [finish_times[winner] + t - winner_wall for t in cancelled.values()]
+        metrics["portfolio_winner_sec"] = round(finish_times[winner], 4)
+        metrics["portfolio_cancelled_after_sec"] = {a: round(t, 4) for a, t in cancelled.items()}
+        # margin over the runner-up: exact when it finished too, otherwise a lower bound from the cancelled solvers
+        runner_up = min(late + bounds, default=None)
+        metrics["portfolio_margin_sec"] = (round(max(0.0, runner_up - finish_times[winner]), 4)
+                                          if runner_up is not None else None)
+        metrics["portfolio_margin_is_lower_bound"] = bool(bounds) and (not late or min(bounds) < min(late))
+        metrics["winner_metrics"] = winner_metrics
+
+        if self.__history is not None:
+            participants = [a for a, o in outcomes.items() if o != "not_started"]
+            self.__history.record(self.__n, winner, finish_times[winner], participants)
+
+        return winner_result, metrics
@@ -0,0 +1,105 @@
+import time
+
+
+class ClueFacts:
+    """
+    Facts implied by the clues alone: reduced starting domains per cell and the cells they fix.
+    Computed once per puzzle and shared by every solver. A SolverSession may also hand over the
+    candidate lines it already propagated, as {"row": {r: lines}, "col": {c: lines}}.
+    """
+
+    def __init__(self, n, domains, elapsed_sec=0.0, lines=None):
+        self.n = n
+        self.domains = domains
+        self.lines = lines
+        self.fixed = {cell: next(iter(values)) for cell, values in domains.items() if len(values) == 1}
+        self.contradiction = any(not values for values in domains.values())
+        self.elapsed_sec = elapsed_sec
+
+    def as_grid(self):
+        return [[self.fixed.get((r, c), 0) for c in range(self.n)] for r in range(self.n)]
+
+    def cell_masks(self):
+        """Allowed values per cell as bitmasks (bit v-1 set when v is allowed), row-major."""
+        masks = []
+        for r in range(self.n):
+            for c in range(self.n):
+                mask = 0
+                for v in self.domains[(r, c)]:
+                    mask |= 1 << (v - 1)
+                masks.append(mask)
+        return masks
+
+    def metrics(self):
+        full = self.n * self.n * self.n
+        return {
+            "preprocess_fixed_cells": len(self.fixed),
+            "preprocess_pruned_values": full - sum(len(values) for values in self.domains.values()),
+            "preprocess_sec": round(self.elapsed_sec, 4),
+        }
+
+
+def _lines(n):
+    """Every line as (front clue key, index, cells ordered away from that edge)."""
+    for i in range(n):
+        row = [(i, c) for c in range(n)]
+        col = [(r, i) for r in range(n)]
+        yield "left", i, row
+        yield "right", i, row[::-1]
+        yield "top", i, col
+        yield "bottom", i, col[::-1]
+
+
+def _clue(clues, direction, i):
+    value = clues[direction][i]
+    return int(value) if str(value).strip().isdigit() else 0
+
+
+def preprocess(data):
+    start = time.perf_counter()
+    n = data["n"]
+    clues = data["clues"]
+    domains = {(r, c): set(range(1, n + 1)) for r in range(n) for c in range(n)}
+
+    for direction, i, cells in _lines(n):
+        clue = _clue(clues, direction, i)
+        if not clue:
+            continue
+        if clue == 1:
+            domains[cells[0]] &= {n}
+            continue
+        if clue == n:
+            # only the ascending line shows every building
+            for d, cell in enumerate(cells):
+                domains[cell] &= {d + 1}
+            continue
+        for d, cell in enumerate(cells):
+            # a building taller than n - clue + 1 + d at distance d would hide too many behind it
+            domains[cell] -= set(range(n - clue + 2 + d, n + 1))
+
+    _propagate_singles(n, domains)
+    return ClueFacts(n, {cell: frozenset(values) for cell, values in domains.items()}, time.perf_counter() - start)
+
+
+def _propagate_singles(n, domains):
+    """Latin-square naked and hidden singles until nothing changes."""
+    units = [[(r, c) for c in range(n)] for r in range(n)] + [[(r, c) for r in range(n)] for c in range(n)]
+    changed = True
+    while changed:
+        changed = False
+        for unit in units:
+            for cell in unit:
+                values = domains[cell]
+                if not values:
+                    return
+                if len(values) == 1:
+                    v = next(iter(values))
+                    for other in unit:
+                        if other != cell and v in domains[other]:
+                            domains[other].discard(v)
+                            changed = True
+            for v in range(1, n + 1):
+                places = [cell for cell in unit if v in domains[cell]]
+                if len(places) == 1 and len(domains[places[0]]) > 1:
+                    domains[places[0]].intersection_update({v})
+                    changed = True
@@ -0,0 +1,73 @@
+import cProfile
+import json
+import os
+import pstats
+
+# how many functions a ranked hot list keeps by default
+HOT_LIMIT = 15
+
+
+def profile_call(fn, *args, **kwargs):
+    """Run fn under the deterministic profiler. Returns (fn's return value, cProfile.Profile)."""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(fn, *args, **kwargs)
+    return result, profiler
+
+
+def function_label(key):
+    filename, line, name = key
+    if filename == "~":
+        # built-ins such as {built-in method builtins.max}
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def hot_functions(stats, limit=HOT_LIMIT):
+    """
+    Rank functions by own time (tottime). `stats` is a pstats.Stats, a Profile or a list of
+    .prof paths. Shares are relative to the total own time of the profile(s).
+    """
+    if not isinstance(stats, pstats.Stats):
+        stats = load_stats(stats) if isinstance(stats, (list, tuple)) else pstats.Stats(stats)
+    if stats is None:
+        return []
+
+    entries = stats.stats
+    total = sum(tottime for _, _, tottime, _, _ in entries.values()) or 1.0
+    ranked = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [
+        {
+            "function": function_label(key),
+            "calls": calls,
+            "tottime_sec": round(tottime, 6),
+            "cumtime_sec": round(cumtime, 6),
+            "share": round(tottime / total, 4),
+        }
+        for key, (_, calls, tottime, cumtime, _) in ranked
+    ]
+
+
+def load_stats(paths):
+    """Merge .prof files into one pstats.Stats; None when there is nothing to load."""
+    paths = [p for p in paths if p and os.path.exists(p)]
+    if not paths:
+        return None
+    stats = pstats.Stats(paths[0])
+    for path in paths[1:]:
+        stats.add(path)
+    return stats
+
+
+def aggregate_profiles(paths, out_prefix, limit=HOT_LIMIT):
+    """
+    Combine the profiles of a whole run into <out_prefix>.prof (loadable by pstats, snakeviz or
+    flameprof) and <out_prefix>.hot.json with the ranked hot functions. Returns the hot list.
+    """
+    stats = load_stats(paths)
+    if stats is None:
+        return []
+    stats.dump_stats(out_prefix + ".prof")
+    hot = hot_functions(stats, limit)
+    with open(out_prefix + ".hot.json", "w", encoding="utf-8") as f:
+        json.dump({"profiles": len([p for p in paths if p]), "hot_functions": hot}, f, indent=2)
+    return hot
@@ -1,54 +1,147 @@
-from A_star_Weighted_A_star.a_star_solver import AStarSolver
-from CSP_AC3.csp_solver import CSPSolver
-from Controller.data_checking import DataChecker
-from HillClimbingSA.hill_climbing_sa import HillClimbSolver
+from Controller.background import BackgroundSolve
+from Controller.batch import BatchRun
+from Controller.data_checking import validate_puzzle
+from Controller.solution_cache import cached_solve, hit_response, remember
+from Controller.solvers import solve_puzzle
+from SharedFunctions.deadline import Deadline
+from SharedFunctions.instrumentation import Instrumentation
 import concurrent.futures
+import os
+import time
+
+DEFAULT_TIMEOUT_SEC = 180
+# extra time granted to a solver to notice its deadline and return partial metrics
+CANCEL_GRACE_SEC = 5
 
 
 class PuzzleManager:
-    def __init__(self, data:dict, algorithm:str):
+    def __init__(self, data:dict, algorithm:str, timeout=DEFAULT_TIMEOUT_SEC, portfolio_history=None, cache=None,
+                 use_preprocessing=True, trace_memory=False, profile_dir=None, phase_timers=True, trace=None,
+                 ordering=None):
         self.__data = data
         self.__algorithm = algorithm
+        self.__timeout = timeout
+        self.__portfolio_history = portfolio_history
+        self.__cache = cache
+        self.__use_preprocessing = use_preprocessing
+        self.__trace_memory = trace_memory
+        self.__profile_dir = profile_dir
+        self.__phase_timers = phase_timers
+        # optional TraceRecorder; the caller owns it and closes it once the solve is done
+        self.__trace = trace
+        # optional OrderingTable, or its path, for CSP value ordering
+        self.__ordering = ordering
 
-    def run(self):
+    def run(self, timeout=None):
         valid_result = self.__validate()
         if valid_result is not None:
             error = valid_result[1] if isinstance(valid_result, tuple) else None
             if error:
                 return None, error
 
-        return self.__route()
+        timeout = self.__timeout if timeout is None else timeout
+        # a traced solve has to run the solver, so it never answers from the cache
+        if self.__cache is not None and self.__trace is None:
+            return cached_solve(self.__cache, self.__data, self.__algorithm, lambda: self.__route(timeout))
+
+        return self.__route(timeout)
+
+    async def solve_async(self, timeout=None, pool=None):
+        """
+        Solve on an AsyncSolverPool worker. `ordering`, `trace_memory` and `use_preprocessing` are
+        forwarded; `profile_dir`, `phase_timers` and `trace` only apply to run() and run_in_background(),
+        since the solve happens in another process.
+        """
+        valid_result = self.__validate()
+        if valid_result is not None:
+            return valid_result
+
+        timeout = self.__timeout if timeout is None else timeout
+        if pool is None:
+            # asyncio is expensive to import; only async callers pay for it
+            from Controller.async_solver import get_async_pool
+            pool = get_async_pool()
+        if self.__cache is not None:
+            start = time.perf_counter()
+            hit = self.__cache.lookup(self.__data)
+            if hit is not None:
+                return hit_response(self.__cache, hit, time.perf_counter() - start)
+
+        result, metrics = await pool.solve(self.__data, self.__algorithm, timeout, self.__use_preprocessing,
+                                           self.__trace_memory, self.__ordering)
+        if self.__cache is not None:
+            return remember(self.__cache, self.__data, self.__algorithm, result, metrics)
+        return result, metrics
+
+    def run_in_background(self, timeout=None):
+        """
+        Start the solve on the shared background thread pool and return at once. The returned
+        BackgroundSolve exposes live progress(), cancel() and, once done(), result().
+        """
+        timeout = self.__timeout if timeout is None else timeout
+        deadline = Deadline(timeout)
+        instrumentation = Instrumentation(enabled=self.__phase_timers, trace_memory=self.__trace_memory,
+                                          trace=self.__trace)
+        return BackgroundSolve(lambda: self.__solve_now(deadline, instrumentation), deadline, instrumentation)
+
+    @staticmethod
+    def run_batch(puzzles, algorithm, workers=None, timeout=DEFAULT_TIMEOUT_SEC, chunk_size=8, phase_timers=True,
+                  shared_memory=False, ordering=None):
+        return BatchRun(puzzles, algorithm, workers=workers, timeout=timeout, chunk_size=chunk_size,
+                        phase_timers=phase_timers, shared_memory=shared_memory, ordering=ordering)
 
     def __validate(self):
-        try:
-            checker = DataChecker(self.__data)
-            if not checker.general_check():
-                return None, "Invalid puzzle: clues are inconsistent or out of range"
-        except ValueError as e:
-            return None, str(e)
+        error = validate_puzzle(self.__data)
+        if error is not None:
+            return None, error
 
 
-    def __route(self):
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+    def __route(self, timeout):
+        deadline = Deadline(timeout)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(self.__run_algorithm, deadline)
+
+        try:
+            wait = None if timeout is None else timeout + CANCEL_GRACE_SEC
+            result, metrics = future.result(timeout=wait)
+            return result, metrics
 
-            future = executor.submit(self.__run_algorithm)
+        except concurrent.futures.TimeoutError:
+            deadline.cancel()
+            return None, {"error": f"Timeout after {timeout} seconds", "timed_out": True}
 
-            try:
-                result, metrics = future.result(timeout=180)
-                return result, metrics
+        finally:
+            # never block on a solver that is still unwinding after cancellation
+            executor.shutdown(wait=False)
+
+    def __solve_now(self, deadline, instrumentation):
+        valid_result = self.__validate()
+        if valid_result is not None:
+            return valid_result
 
-            except concurrent.futures.TimeoutError:
-                return None, {"error": "Timeout after 600 seconds"}
+        solve = lambda: self.__run_algorithm(deadline, instrumentation)
+        if self.__cache is not None and self.__trace is None:
+            return cached_solve(self.__cache, self.__data, self.__algorithm, solve)
+        return solve()
 
-    def __run_algorithm(self):
-        if self.__algorithm == "CSP":
-            return CSPSolver.solve(self.__data)
+    def __run_algorithm(self, deadline, instrumentation=None):
+        if self.__profile_dir is not None:
+            return self.__run_profiled(deadline, instrumentation)
+        return solve_puzzle(self.__data, self.__algorithm, deadline, self.__portfolio_history,
+                            self.__use_preprocessing, self.__trace_memory, instrumentation, self.__phase_timers,
+                            self.__trace, self.__ordering)
 
-        if self.__algorithm == "A*":
-            solver = AStarSolver(self.__data)
-            return solver.solve()
+    def __run_profiled(self, deadline, instrumentation=None):
+        # only imported when profiling is requested; portfolio members run in other processes and are not captured
+        from Controller.profiling import hot_functions, profile_call
 
-        if self.__algorithm == "HillClimb":
-            return HillClimbSolver.solve(self.__data)
+        (result, metrics), profiler = profile_call(
+            solve_puzzle, self.__data, self.__algorithm, deadline, self.__portfolio_history,
+            self.__use_preprocessing, self.__trace_memory, instrumentation, self.__phase_timers, self.__trace,
+            self.__ordering)
 
-        return None, {"error": "Unknown algorithm"}
+        os.makedirs(self.__profile_dir, exist_ok=True)
+        name = self.__algorithm.replace("*", "star").lower()
+        path = os.path.join(self.__profile_dir, f"{name}-n{self.__data['n']}-{time.time_ns()}.prof")
+        profiler.dump_stats(path)
+        return result, {**metrics, "profile_path": path, "profile_hot_functions": hot_functions(profiler, 10)}
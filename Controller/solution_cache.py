@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import OrderedDict
+
+from SharedFunctions.board import CompactBoard, as_board
+
+
+def _transform(matrix, t):
+    """
+    Apply symmetry `t` (0..7) of the square to a square matrix: an optional left-right
+    mirror (t >= 4) followed by (t % 4) clockwise quarter turns.
+    """
+    size = len(matrix)
+    out = [row[:] for row in matrix]
+    if t >= 4:
+        out = [row[::-1] for row in out]
+    for _ in range(t % 4):
+        out = [[out[size - 1 - j][i] for j in range(size)] for i in range(size)]
+    return out
+
+
+def _find_inverses():
+    probe = [[0, 1, 2], [3, 4, 5], [6, 7, 8]]
+    inverses = {}
+    for t in range(8):
+        moved = _transform(probe, t)
+        inverses[t] = next(u for u in range(8) if _transform(moved, u) == probe)
+    return inverses
+
+
+_INVERSE = _find_inverses()
+
+
+def _as_int(value):
+    return int(value) if str(value).strip().isdigit() else 0
+
+
+def puzzle_frame(data):
+    """
+    Border the n x n grid givens with the clues: top/bottom clues become the first/last row,
+    left/right clues the first/last column. Rotating or reflecting the frame transforms
+    clues and givens together, exactly as the puzzle itself transforms.
+    """
+    n = data["n"]
+    clues = data["clues"]
+    grid = data.get("grid")
+    frame = [[0] * (n + 2) for _ in range(n + 2)]
+
+    for i in range(n):
+        frame[0][i + 1] = _as_int(clues["top"][i])
+        frame[n + 1][i + 1] = _as_int(clues["bottom"][i])
+        frame[i + 1][0] = _as_int(clues["left"][i])
+        frame[i + 1][n + 1] = _as_int(clues["right"][i])
+        if grid:
+            for j in range(n):
+                frame[i + 1][j + 1] = _as_int(grid[i][j])
+    return frame
+
+
+def canonicalize(data):
+    """
+    Return (key, t): the lexicographically smallest frame over the 8 symmetries of the square,
+    and the symmetry that maps the caller's orientation onto it.
+    """
+    frame = puzzle_frame(data)
+    best_t, best = min(((t, _transform(frame, t)) for t in range(8)), key=lambda item: item[1])
+    key = f"{data['n']}:" + "/".join(",".join(map(str, row)) for row in best)
+    return key, best_t
+
+
+class SolutionCache:
+    """
+    Solution cache keyed by the symmetry-canonical form of a puzzle. An in-memory LRU sits in
+    front of an optional SQLite store, so rotated or reflected variants of a solved puzzle are
+    answered without running a solver.
+    """
+
+    def __init__(self, max_entries=4096, db_path=None):
+        self.__max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+        self.__db = None
+        if db_path is not None:
+            import sqlite3
+            self.__db = sqlite3.connect(db_path, check_same_thread=False)
+            self.__db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                              "(key TEXT PRIMARY KEY, n INTEGER NOT NULL, grid BLOB NOT NULL, algorithm TEXT)")
+            self.__db.commit()
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    def stats(self):
+        return {"cache_hits": self.__hits, "cache_misses": self.__misses}
+
+    def lookup(self, data):
+        n = data["n"]
+        key, t = canonicalize(data)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+            elif self.__db is not None:
+                row = self.__db.execute("SELECT grid, algorithm FROM solutions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    flat = list(row[0])
+                    entry = ([flat[r * n:(r + 1) * n] for r in range(n)], row[1])
+                    self.__remember(key, entry)
+
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__hits += 1
+
+        canonical_grid, algorithm = entry
+        return CompactBoard.from_grid(_transform(canonical_grid, _INVERSE[t])), algorithm
+
+    def store(self, data, solution, algorithm=None):
+        n = data["n"]
+        key, t = canonicalize(data)
+        canonical_grid = _transform(as_board(n, solution).to_grid(), t)
+
+        with self.__lock:
+            self.__remember(key, (canonical_grid, algorithm))
+            if self.__db is not None:
+                blob = bytes(v for row in canonical_grid for v in row)
+                self.__db.execute("INSERT OR REPLACE INTO solutions (key, n, grid, algorithm) VALUES (?, ?, ?, ?)",
+                                  (key, n, blob, algorithm))
+                self.__db.commit()
+
+    def __remember(self, key, entry):
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last=False)
+
+    def close(self):
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
+
+
+def cached_solve(cache, data, algorithm, solve):
+    """Answer from `cache` when possible, otherwise call `solve()` and remember its solution."""
+    start = time.perf_counter()
+    hit = cache.lookup(data)
+    if hit is not None:
+        return hit_response(cache, hit, time.perf_counter() - start)
+
+    return remember(cache, data, algorithm, *solve())
+
+
+def hit_response(cache, hit, elapsed):
+    solution, cached_algorithm = hit
+    metrics = {
+        "runtime_sec": round(elapsed, 4),
+        "cache_hit": True,
+        "cached_algorithm": cached_algorithm,
+    }
+    return solution, {**metrics, **cache.stats()}
+
+
+def remember(cache, data, algorithm, result, metrics):
+    if result is not None:
+        cache.store(data, result, algorithm)
+    if isinstance(metrics, dict):
+        metrics = {**metrics, "cache_hit": False, **cache.stats()}
+    return result, metrics
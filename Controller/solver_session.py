@@ -0,0 +1,298 @@
+import time
+from collections import deque
+
+from Controller.data_checking import validate_puzzle
+from Controller.preprocessing import ClueFacts
+from Controller.solvers import run_solver
+from SharedFunctions.board import CompactBoard
+from SharedFunctions.deadline import Deadline, DeadlineExceeded
+from SharedFunctions.line_kernel import candidate_lines, line_visibility
+
+DEFAULT_TIMEOUT_SEC = 180
+
+DIRECTIONS = ("top", "bottom", "left", "right")
+
+
+def _value(x):
+    return int(x) if str(x).strip().isdigit() else 0
+
+
+class SolverSession:
+    """
+    Stateful re-solve for editing tools: keep one session per puzzle, apply set_clue()/set_cell()
+    edits and call solve() again. Between calls the session keeps, per row and column, the
+    clue-consistent candidate lines filtered by the givens, and the line-support propagation
+    over them (cell domains as bitmasks plus the surviving lines). An edit refilters only the
+    lines it touches:
+
+    * the previous solution is checked against the edited lines only, and returned at once
+      when it still fits;
+    * edits that only add givens resume propagation from the previous fixpoint, any other edit
+      re-propagates from the cached per-line candidates;
+    * the chosen solver then starts from the propagated domains (and, for CSP and DLX, the
+      surviving lines) instead of the raw clues.
+
+    Givens are honoured by every algorithm.
+    """
+
+    def __init__(self, data, algorithm="CSP", timeout=DEFAULT_TIMEOUT_SEC):
+        n = int(data["n"])
+        self.__n = n
+        self.__algorithm = algorithm
+        self.__timeout = timeout
+        self.__clues = {d: [_value(x) for x in data["clues"][d]] for d in DIRECTIONS}
+        grid = data.get("grid") or [[0] * n for _ in range(n)]
+        self.__grid = [[_value(x) for x in row] for row in grid]
+        self.__bits = [0] + [1 << (v - 1) for v in range(1, n + 1)]
+        self.__full = (1 << n) - 1
+
+        # per line ("row", r) / ("col", c): candidates after givens, and those surviving propagation
+        self.__base = {}
+        self.__live = {}
+        # masks each line was last filtered against, so a refilter only looks at changed cells
+        self.__filtered = {}
+        self.__masks = [self.__full] * (n * n)
+        self.__consistent = True
+
+        # edits not yet propagated; None means propagation starts over
+        self.__dirty = None
+        self.__tightening = False
+        # edits since the last solution, checked against it before anything else
+        self.__solution = None
+        self.__changed_cells = set()
+        self.__changed_lines = set()
+        self.__edits = 0
+
+    @property
+    def data(self):
+        return {
+            "n": self.__n,
+            "clues": {d: list(values) for d, values in self.__clues.items()},
+            "grid": [row[:] for row in self.__grid],
+        }
+
+    @property
+    def algorithm(self):
+        return self.__algorithm
+
+    @algorithm.setter
+    def algorithm(self, algorithm):
+        self.__algorithm = algorithm
+
+    def set_clue(self, direction, i, value):
+        value = _value(value)
+        if self.__clues[direction][i] == value:
+            return
+        self.__clues[direction][i] = value
+        key = ("row", i) if direction in ("left", "right") else ("col", i)
+        self.__edits += 1
+        self.__changed_lines.add(key)
+        self.__mark([key], tightening=False)
+
+    def set_cell(self, r, c, value):
+        """Set a given (0 or "" clears it)."""
+        value = _value(value)
+        previous = self.__grid[r][c]
+        if previous == value:
+            return
+        self.__grid[r][c] = value
+        self.__edits += 1
+        self.__changed_cells.add((r, c))
+        # adding a given only narrows the puzzle, so the old fixpoint stays a valid start
+        self.__mark([("row", r), ("col", c)], tightening=not previous)
+
+    def __mark(self, keys, tightening):
+        if self.__dirty is None:
+            return
+        if not self.__dirty:
+            self.__tightening = True
+        self.__dirty.update(keys)
+        self.__tightening = self.__tightening and tightening
+
+    def solve(self, timeout=None):
+        start = time.perf_counter()
+        data = self.data
+        error = validate_puzzle(data)
+        if error is not None:
+            return None, {"error": error}
+
+        metrics = {"session_edits": self.__edits}
+        reused = self.__reuse()
+        if reused is not None:
+            self.__changed_cells.clear()
+            self.__changed_lines.clear()
+            return reused, {**metrics, "solver": "session", "success": True, "session_mode": "reused",
+                            "runtime_sec": round(time.perf_counter() - start, 6)}
+
+        timeout = self.__timeout if timeout is None else timeout
+        deadline = Deadline(timeout)
+        propagate_start = time.perf_counter()
+        try:
+            incremental, lines_recomputed = self.__update(deadline)
+        except DeadlineExceeded as e:
+            # the propagation state is half updated; start over on the next solve
+            self.__dirty = None
+            return None, {**metrics, "error": str(e), "timed_out": True,
+                          "runtime_sec": round(time.perf_counter() - start, 6)}
+        metrics.update({
+            "session_incremental": incremental,
+            "session_lines_recomputed": lines_recomputed,
+            "session_propagation_ms": round((time.perf_counter() - propagate_start) * 1000, 3),
+        })
+
+        if not self.__consistent:
+            return None, {**metrics, "solver": "session", "success": False, "session_mode": "propagated",
+                          "error": "No solution: clues and givens are contradictory",
+                          "runtime_sec": round(time.perf_counter() - start, 6)}
+
+        if all(self.__masks[i] & (self.__masks[i] - 1) == 0 for i in range(self.__n * self.__n)):
+            result = CompactBoard(self.__n, [m.bit_length() for m in self.__masks])
+            solver_metrics = {"solver": "session", "success": True}
+            mode = "propagated"
+        else:
+            result, solver_metrics = run_solver(data, self.__algorithm, deadline, self.__facts())
+            mode = "searched"
+
+        if result is not None:
+            self.__solution = result
+            self.__changed_cells.clear()
+            self.__changed_lines.clear()
+        return result, {**solver_metrics, **metrics, "session_mode": mode,
+                        "runtime_sec": round(time.perf_counter() - start, 6)}
+
+    def __reuse(self):
+        """The previous solution, if it still satisfies every edited line and given."""
+        board = self.__solution
+        if board is None:
+            return None
+        for r, c in self.__changed_cells:
+            given = self.__grid[r][c]
+            if given and board.value(r, c) != given:
+                return None
+        for kind, i in self.__changed_lines:
+            line = board.row(i) if kind == "row" else board.col(i)
+            front, back = self.__line_clues((kind, i))
+            if (front, back) != tuple(line_visibility(line)):
+                return None
+        return board
+
+    def __line_clues(self, key):
+        kind, i = key
+        if kind == "row":
+            return self.__clues["left"][i], self.__clues["right"][i]
+        return self.__clues["top"][i], self.__clues["bottom"][i]
+
+    def __cells(self, key):
+        kind, i = key
+        n = self.__n
+        if kind == "row":
+            return [i * n + c for c in range(n)]
+        return [r * n + i for r in range(n)]
+
+    def __rebuild_base(self, key, deadline):
+        n = self.__n
+        front, back = self.__line_clues(key)
+        lines = candidate_lines(n, front, back, deadline)
+        kind, i = key
+        givens = [(k, self.__grid[i][k] if kind == "row" else self.__grid[k][i]) for k in range(n)]
+        for k, v in givens:
+            if v:
+                lines = [line for line in lines if line[k] == v]
+        self.__base[key] = lines
+
+    def __update(self, deadline):
+        """Bring the propagation up to date; returns (resumed from the previous fixpoint, lines refiltered)."""
+        n = self.__n
+        keys = [("row", i) for i in range(n)] + [("col", i) for i in range(n)]
+        if self.__dirty is None:
+            dirty, tightening = set(keys), False
+        else:
+            dirty, tightening = self.__dirty, self.__tightening
+        for key in dirty:
+            self.__rebuild_base(key, deadline)
+
+        if tightening and self.__consistent:
+            # resume: the surviving lines can only shrink
+            for key in dirty:
+                self.__live[key] = self.__intersect(self.__live[key], key)
+            queue = dirty
+        else:
+            self.__live = dict(self.__base)
+            self.__filtered = {key: [self.__full] * n for key in keys}
+            self.__masks = [self.__full] * (n * n)
+            queue = keys
+
+        self.__consistent = self.__propagate(queue, deadline)
+        self.__dirty = set()
+        self.__tightening = False
+        return tightening, len(dirty)
+
+    def __intersect(self, live, key):
+        kind, i = key
+        n = self.__n
+        for k in range(n):
+            v = self.__grid[i][k] if kind == "row" else self.__grid[k][i]
+            if v:
+                live = [line for line in live if line[k] == v]
+        return live
+
+    def __propagate(self, keys, deadline):
+        """Line-support propagation: a cell keeps a value only if both its row and column have a line with it."""
+        n = self.__n
+        bits = self.__bits
+        masks = self.__masks
+        queue = deque(keys)
+        queued = set(keys)
+        steps = 0
+        while queue:
+            steps += 1
+            if not (steps & 0x3F):
+                deadline.check()
+            key = queue.popleft()
+            queued.discard(key)
+            live = self.__refilter(key)
+            if not live:
+                return False
+
+            crossing = "col" if key[0] == "row" else "row"
+            for k, (cell, values) in enumerate(zip(self.__cells(key), zip(*live))):
+                support = 0
+                for v in set(values):
+                    support |= bits[v]
+                narrowed = masks[cell] & support
+                if narrowed != masks[cell]:
+                    masks[cell] = narrowed
+                    if not narrowed:
+                        return False
+                    other = (crossing, k)
+                    if other not in queued:
+                        queued.add(other)
+                        queue.append(other)
+        return True
+
+    def __refilter(self, key):
+        """Drop the line's candidates that use a value its cells no longer allow."""
+        masks = self.__masks
+        seen = self.__filtered[key]
+        live = self.__live[key]
+        for k, cell in enumerate(self.__cells(key)):
+            mask = masks[cell]
+            if mask != seen[k]:
+                allowed = {v for v in range(1, self.__n + 1) if mask & self.__bits[v]}
+                live = [line for line in live if line[k] in allowed]
+                seen[k] = mask
+        self.__live[key] = live
+        return live
+
+    def __facts(self):
+        n = self.__n
+        domains = {}
+        for r in range(n):
+            for c in range(n):
+                mask = self.__masks[r * n + c]
+                domains[(r, c)] = frozenset(v for v in range(1, n + 1) if mask & self.__bits[v])
+        lines = {
+            "row": {i: self.__live[("row", i)] for i in range(n)},
+            "col": {i: self.__live[("col", i)] for i in range(n)},
+        }
+        return ClueFacts(n, domains, lines=lines)
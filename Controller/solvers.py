@@ -0,0 +1,52 @@
+from A_star_Weighted_A_star.a_star_solver import AStarSolver
+from CSP_AC3.csp_solver import CSPSolver
+from Controller.preprocessing import preprocess
+from DLX_ExactCover.dlx_solver import DLXSolver
+from HillClimbingSA.hill_climbing_sa import HillClimbSolver
+from LNS_Hybrid.lns_solver import LNSSolver
+from SharedFunctions.instrumentation import Instrumentation
+from SharedFunctions.ordering_table import as_ordering_table
+
+ALGORITHMS = ("CSP", "A*", "HillClimb", "DLX", "LNS")
+
+
+def run_solver(data, algorithm, deadline=None, facts=None, instrumentation=None, ordering=None):
+    # ordering: an OrderingTable (or its path) for CSP's value order; the other solvers ignore it
+    ordering = as_ordering_table(ordering)
+    if algorithm == "CSP":
+        return CSPSolver.solve(data, deadline, facts, instrumentation, ordering)
+
+    if algorithm == "A*":
+        solver = AStarSolver(data, deadline=deadline, facts=facts, instrumentation=instrumentation)
+        return solver.solve()
+
+    if algorithm == "HillClimb":
+        return HillClimbSolver.solve(data, deadline, facts, instrumentation)
+
+    if algorithm == "DLX":
+        return DLXSolver.solve(data, deadline, facts, instrumentation)
+
+    if algorithm == "LNS":
+        return LNSSolver.solve(data, deadline, facts, instrumentation)
+
+    return None, {"error": "Unknown algorithm"}
+
+
+def solve_puzzle(data, algorithm, deadline=None, portfolio_history=None, use_preprocessing=True, trace_memory=False,
+                 instrumentation=None, phase_timers=True, trace=None, ordering=None):
+    facts = preprocess(data) if use_preprocessing else None
+    if facts is not None and facts.contradiction:
+        return None, {"error": "No solution: clues are contradictory", **facts.metrics()}
+
+    if algorithm == "portfolio":
+        # imported lazily: the portfolio itself dispatches through run_solver
+        from Controller.portfolio import PortfolioSolver
+        result, metrics = PortfolioSolver(data, history=portfolio_history, facts=facts).solve(deadline)
+    else:
+        # phase_timers=False keeps only the wall clock and counters (Instrumentation's no-op mode)
+        instrumentation = instrumentation or Instrumentation(enabled=phase_timers, trace_memory=trace_memory, trace=trace)
+        result, metrics = run_solver(data, algorithm, deadline, facts, instrumentation, ordering)
+
+    if facts is not None and isinstance(metrics, dict):
+        metrics = {**metrics, **facts.metrics()}
+    return result, metrics
@@ -0,0 +1,293 @@
+from SharedFunctions.board import CompactBoard
+from SharedFunctions.deadline import DeadlineExceeded
+from SharedFunctions.instrumentation import Instrumentation
+from SharedFunctions.line_kernel import candidate_lines
+
+# deadline and progress checks: every this many search nodes, and every this many options unlinked
+# or built, since a single cover at n=9 can walk tens of thousands of options
+CHECK_EVERY_NODES = 16
+CHECK_EVERY_OPTIONS = 4096
+
+
+class DLXSolver:
+    """
+    Skyscrapers as exact cover, solved with Dancing Links (Knuth's Algorithm X).
+
+    Primary items: one selector per row R_r and per column C_c, plus P(r, c, v) for every cell
+    and value. A row option takes R_r and P(r, c, line[c]) for each c; a column option takes
+    C_c and P(r, c, v) for every v != line[r]. Every P item is then covered exactly once iff
+    the chosen row and column lines agree at that cell. Options come from the same
+    clue-consistent candidate lines CSP uses.
+    """
+
+    def __init__(self, puzzle_data, deadline=None, facts=None, instrumentation=None):
+        self.__n = puzzle_data["n"]
+        self.__clues = puzzle_data["clues"]
+        self.__givens = [
+            [int(x) if str(x).isdigit() else 0 for x in row]
+            for row in puzzle_data.get("grid", [[0] * self.__n for _ in range(self.__n)])
+        ]
+        self.__deadline = deadline
+        self.__facts = facts
+        self.__inst = instrumentation or Instrumentation()
+
+        self.__row_lines = {}
+        self.__col_lines = {}
+        self.__candidates_pruned = 0
+
+        # the dancing-links structure, as parallel arrays indexed by node; nodes 1..items are headers
+        self.__left = []
+        self.__right = []
+        self.__up = []
+        self.__down = []
+        self.__item = []
+        self.__size = []
+        self.__option = []
+        self.__options = []
+        self.__items = 0
+
+        self.__nodes_expanded = 0
+        self.__options_tried = 0
+        self.__solutions_found = 0
+        self.__first_solution = None
+        self.__work = 0
+
+    def __prepare_lines(self):
+        n = self.__n
+        clues = self.__clues
+        deadline = self.__deadline
+        if self.__facts is not None and self.__facts.lines is not None:
+            # already filtered and propagated by a SolverSession
+            self.__row_lines = dict(self.__facts.lines["row"])
+            self.__col_lines = dict(self.__facts.lines["col"])
+            return
+        self.__row_lines = {r: candidate_lines(n, clues["left"][r], clues["right"][r], deadline) for r in range(n)}
+        self.__col_lines = {c: candidate_lines(n, clues["top"][c], clues["bottom"][c], deadline) for c in range(n)}
+
+    def __allowed(self):
+        """Allowed values per cell: the preprocessed domains narrowed to the nonzero givens."""
+        n = self.__n
+        full = frozenset(range(1, n + 1))
+        allowed = {}
+        for r in range(n):
+            for c in range(n):
+                values = self.__facts.domains[(r, c)] if self.__facts is not None else full
+                given = self.__givens[r][c]
+                allowed[(r, c)] = values & {given} if given else values
+        return allowed
+
+    def __prune_lines(self):
+        """Drop candidate lines outside the preprocessed cell domains or contradicting a given."""
+        if self.__facts is None and not any(any(row) for row in self.__givens):
+            return
+        allowed = self.__allowed()
+        n = self.__n
+        for r, lines in self.__row_lines.items():
+            self.__checkpoint(len(lines))
+            kept = [line for line in lines if all(line[c] in allowed[(r, c)] for c in range(n))]
+            self.__candidates_pruned += len(lines) - len(kept)
+            self.__row_lines[r] = kept
+        for c, lines in self.__col_lines.items():
+            self.__checkpoint(len(lines))
+            kept = [line for line in lines if all(line[r] in allowed[(r, c)] for r in range(n))]
+            self.__candidates_pruned += len(lines) - len(kept)
+            self.__col_lines[c] = kept
+
+    def __checkpoint(self, work):
+        """Account for `work` options handled; report progress and check the deadline once enough piled up."""
+        self.__work += work
+        if self.__work < CHECK_EVERY_OPTIONS:
+            return
+        self.__work = 0
+        self.__inst.progress(nodes_expanded=self.__nodes_expanded, nodes_generated=self.__options_tried,
+                             solutions=self.__solutions_found)
+        if self.__deadline is not None:
+            self.__deadline.check()
+
+    def __build(self):
+        n = self.__n
+        # item numbering: rows 1..n, columns n+1..2n, then P(r, c, v)
+        self.__items = items = 2 * n + n * n * n
+        self.__left = list(range(-1, items))
+        self.__left[0] = items
+        self.__right = list(range(1, items + 2))
+        self.__right[items] = 0
+        self.__up = list(range(items + 1))
+        self.__down = list(range(items + 1))
+        self.__item = list(range(items + 1))
+        self.__size = [0] * (items + 1)
+        self.__option = [-1] * (items + 1)
+
+        def p_item(r, c, v):
+            return 2 * n + (r * n + c) * n + v
+
+        for r, lines in self.__row_lines.items():
+            for line in lines:
+                self.__checkpoint(1)
+                self.__add_option(("row", r, line), [1 + r] + [p_item(r, c, line[c]) for c in range(n)])
+        for c, lines in self.__col_lines.items():
+            for line in lines:
+                self.__checkpoint(1)
+                self.__add_option(("col", c, line),
+                                  [1 + n + c] + [p_item(r, c, v) for r in range(n) for v in range(1, n + 1)
+                                                 if v != line[r]])
+
+    def __add_option(self, payload, option_items):
+        index = len(self.__options)
+        self.__options.append(payload)
+        left, right, up, down = self.__left, self.__right, self.__up, self.__down
+        first = len(left)
+        for k, i in enumerate(option_items):
+            x = first + k
+            self.__item.append(i)
+            self.__option.append(index)
+            up.append(up[i])
+            down.append(i)
+            down[up[i]] = x
+            up[i] = x
+            self.__size[i] += 1
+            left.append(x - 1 if k else first + len(option_items) - 1)
+            right.append(x + 1 if k < len(option_items) - 1 else first)
+
+    def __cover(self, i):
+        left, right, up, down, item, size = self.__left, self.__right, self.__up, self.__down, self.__item, self.__size
+        left[right[i]] = left[i]
+        right[left[i]] = right[i]
+        x = down[i]
+        removed = 0
+        while x != i:
+            removed += 1
+            y = right[x]
+            while y != x:
+                up[down[y]] = up[y]
+                down[up[y]] = down[y]
+                size[item[y]] -= 1
+                y = right[y]
+            x = down[x]
+        self.__checkpoint(removed)
+
+    def __uncover(self, i):
+        left, right, up, down, item, size = self.__left, self.__right, self.__up, self.__down, self.__item, self.__size
+        x = up[i]
+        while x != i:
+            y = left[x]
+            while y != x:
+                size[item[y]] += 1
+                up[down[y]] = y
+                down[up[y]] = y
+                y = left[y]
+            x = up[x]
+        left[right[i]] = i
+        right[left[i]] = i
+
+    def __choose_item(self):
+        """MRV: the uncovered item with the fewest remaining options."""
+        right, size = self.__right, self.__size
+        best, best_size = 0, None
+        i = right[0]
+        while i:
+            s = size[i]
+            if best_size is None or s < best_size:
+                best, best_size = i, s
+                if s <= 1:
+                    break
+            i = right[i]
+        return best, best_size
+
+    def __search(self, chosen, limit):
+        self.__nodes_expanded += 1
+        if not (self.__nodes_expanded % CHECK_EVERY_NODES):
+            self.__checkpoint(CHECK_EVERY_OPTIONS)
+
+        i, count = self.__choose_item()
+        if i == 0:
+            self.__solutions_found += 1
+            if self.__first_solution is None:
+                self.__first_solution = list(chosen)
+            return limit is not None and self.__solutions_found >= limit
+        if count == 0:
+            return False
+
+        right, left, down, item = self.__right, self.__left, self.__down, self.__item
+        self.__cover(i)
+        x = down[i]
+        while x != i:
+            self.__options_tried += 1
+            chosen.append(self.__option[x])
+            y = right[x]
+            while y != x:
+                self.__cover(item[y])
+                y = right[y]
+
+            done = self.__search(chosen, limit)
+
+            y = left[x]
+            while y != x:
+                self.__uncover(item[y])
+                y = left[y]
+            chosen.pop()
+            if done:
+                self.__uncover(i)
+                return True
+            x = down[x]
+        self.__uncover(i)
+        return False
+
+    def __board(self, chosen):
+        n = self.__n
+        grid = [None] * n
+        for index in chosen:
+            kind, r, line = self.__options[index]
+            if kind == "row":
+                grid[r] = list(line)
+        return CompactBoard.from_grid(grid)
+
+    @staticmethod
+    def solve(puzzle_data, deadline=None, facts=None, instrumentation=None):
+        return DLXSolver.__run(puzzle_data, deadline, facts, instrumentation, limit=1)
+
+    @staticmethod
+    def count_solutions(puzzle_data, limit=None, deadline=None, facts=None, instrumentation=None):
+        """Enumerate solutions (all of them, or stop at `limit`). Returns (count, metrics)."""
+        _, metrics = DLXSolver.__run(puzzle_data, deadline, facts, instrumentation, limit=limit)
+        return metrics.get("solutions_found", 0), metrics
+
+    @staticmethod
+    def __run(puzzle_data, deadline, facts, instrumentation, limit):
+        inst = instrumentation or Instrumentation()
+        solver = DLXSolver(puzzle_data, deadline, facts, inst)
+        error = None
+        result = None
+
+        inst.start()
+        try:
+            with inst.phase("line_generation"):
+                solver.__prepare_lines()
+            with inst.phase("initial_propagation"):
+                solver.__prune_lines()
+                solver.__build()
+            with inst.phase("search"):
+                solver.__search([], limit)
+        except DeadlineExceeded as e:
+            error = str(e)
+
+        with inst.phase("result_formatting"):
+            if solver.__first_solution is not None:
+                result = solver.__board(solver.__first_solution)
+            inst.set_counters(
+                nodes_expanded=solver.__nodes_expanded,
+                nodes_generated=solver.__options_tried,
+                dlx_items=solver.__items,
+                dlx_options=len(solver.__options),
+                dlx_nodes=len(solver.__item),
+                candidates_pruned=solver.__candidates_pruned,
+                solutions_found=solver.__solutions_found,
+            )
+        inst.stop()
+        metrics = {"solver": "DLX", "success": result is not None, **inst.metrics()}
+
+        if error is not None:
+            return None, {"error": error, "timed_out": True, **metrics}
+        if result is None:
+            return None, {"error": "No solution found", **metrics}
+        return result, metrics
@@ -0,0 +1,255 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import platform
+import sys
+
+from CluesGenerator.clues_generator import RandomPuzzleGenerator
+from Controller.profiling import aggregate_profiles
+from Controller.solvers import ALGORITHMS
+from Evaluations.sampling_stats import percentile
+from Evaluations.worker_pool import IsolatedWorkerPool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DIR = os.path.join(ROOT, "benchmarks")
+DEFAULT_SIZES = (4, 5, 6, 7, 8, 9)
+DEFAULT_SEED = 20240501
+# metrics compared by `compare`, all "lower is better"
+GATED_METRICS = ("runtime_p50", "runtime_p95")
+
+
+def corpus_path(directory, n):
+    return os.path.join(directory, "corpus", f"n{n}.jsonl")
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def generate_corpus(directory, sizes, count, seed):
+    os.makedirs(os.path.join(directory, "corpus"), exist_ok=True)
+    manifest = {"seed": seed, "count": count, "files": {}}
+
+    for n in sizes:
+        generator = RandomPuzzleGenerator(n, seed=seed * 100 + n)
+        path = corpus_path(directory, n)
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(count):
+                clues, grid = generator.generate_with_solution()
+                f.write(json.dumps({"id": f"n{n}-{i:04d}", "n": n, "clues": clues, "solution": grid}) + "\n")
+        manifest["files"][str(n)] = {"path": os.path.relpath(path, directory), "sha256": _sha256(path)}
+
+    with open(os.path.join(directory, "corpus", "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_corpus(directory, n, limit=None):
+    puzzles = []
+    with open(corpus_path(directory, n), "r", encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and len(puzzles) >= limit:
+                break
+            puzzles.append(json.loads(line))
+    return puzzles
+
+
+def node_count(metrics):
+    return metrics.get("nodes_expanded")
+
+
+def _summarize(samples, timeout):
+    solved = [s for s in samples if s["solved"]]
+    runtimes = sorted(s["runtime_sec"] for s in solved)
+    nodes = sum(s["nodes"] or 0 for s in solved)
+    busy = sum(runtimes)
+    peaks = [s["peak_bytes"] for s in samples if s.get("peak_bytes") is not None]
+    return {
+        "puzzles": len(samples),
+        "solved": len(solved),
+        "success_rate": len(solved) / len(samples) if samples else None,
+        "timeouts": sum(1 for s in samples if s["timed_out"]),
+        "timeout_sec": timeout,
+        "runtime_p50": percentile(runtimes, 0.50),
+        "runtime_p90": percentile(runtimes, 0.90),
+        "runtime_p95": percentile(runtimes, 0.95),
+        "runtime_p99": percentile(runtimes, 0.99),
+        "runtime_max": runtimes[-1] if runtimes else None,
+        "runtime_mean": busy / len(runtimes) if runtimes else None,
+        "nodes_per_sec": nodes / busy if busy > 0 else None,
+        "peak_memory_bytes_p50": percentile(sorted(peaks), 0.50),
+        "peak_memory_bytes_max": max(peaks) if peaks else None,
+    }
+
+
+def run_benchmark(directory, solvers, sizes, timeout, limit=None, memory=True, label=None, profile=False):
+    with open(os.path.join(directory, "corpus", "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    label = label or datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    out_dir = os.path.join(directory, "reports", label)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # timing, memory and profiles are measured in separate passes: tracemalloc and cProfile distort runtimes
+    timing_pool = IsolatedWorkerPool()
+    memory_pool = IsolatedWorkerPool(trace_memory=True) if memory else None
+    profile_dir = os.path.join(out_dir, "profiles")
+    profile_pool = IsolatedWorkerPool(profile_dir=profile_dir) if profile else None
+    reports = {}
+    try:
+        for solver in solvers:
+            report = {
+                "solver": solver,
+                "label": label,
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "corpus_seed": manifest["seed"],
+                "sizes": {},
+            }
+            profile_paths = []
+            for n in sizes:
+                puzzles = load_corpus(directory, n, limit)
+                samples = []
+                for i, puzzle in enumerate(puzzles):
+                    data = {"n": n, "clues": puzzle["clues"]}
+                    seed = manifest["seed"] * 100000 + n * 1000 + i
+                    status, result, metrics, elapsed = timing_pool.run(data, solver, timeout, seed)
+                    metrics = metrics or {}
+                    sample = {
+                        "solved": status == "ok" and result is not None,
+                        "timed_out": status == "timeout" or bool(metrics.get("timed_out")),
+                        "runtime_sec": elapsed,
+                        "nodes": node_count(metrics),
+                    }
+                    if memory_pool is not None and sample["solved"]:
+                        _, _, mem_metrics, _ = memory_pool.run(data, solver, timeout, seed)
+                        sample["peak_bytes"] = (mem_metrics or {}).get("traced_peak_bytes")
+                    if profile_pool is not None:
+                        _, _, prof_metrics, _ = profile_pool.run(data, solver, timeout, seed)
+                        profile_paths.append((prof_metrics or {}).get("profile_path"))
+                    samples.append(sample)
+
+                report["sizes"][str(n)] = _summarize(samples, timeout)
+                report["sizes"][str(n)]["corpus_sha256"] = manifest["files"][str(n)]["sha256"]
+                print(f"[{solver}] n={n}: {report['sizes'][str(n)]['solved']}/{len(samples)} solved", file=sys.stderr)
+
+            if profile_pool is not None:
+                # <solver>.prof merges the whole corpus; <solver>.hot.json ranks its hot functions
+                report["hot_functions"] = aggregate_profiles(
+                    profile_paths, os.path.join(profile_dir, _file_name(solver)))
+
+            path = os.path.join(out_dir, f"{_file_name(solver)}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            reports[solver] = report
+    finally:
+        timing_pool.close()
+        if memory_pool is not None:
+            memory_pool.close()
+        if profile_pool is not None:
+            profile_pool.close()
+    return out_dir, reports
+
+
+def _file_name(solver):
+    return solver.replace("*", "star").lower()
+
+
+def _load_reports(report_dir):
+    reports = {}
+    for name in sorted(os.listdir(report_dir)):
+        if name.endswith(".json"):
+            with open(os.path.join(report_dir, name), "r", encoding="utf-8") as f:
+                report = json.load(f)
+            reports[report["solver"]] = report
+    return reports
+
+
+def compare(baseline_dir, current_dir, margin):
+    """Return a list of regressions: a gated runtime metric slowed down by more than `margin`, or the success rate dropped."""
+    baseline = _load_reports(baseline_dir)
+    current = _load_reports(current_dir)
+    regressions = []
+    rows = []
+
+    for solver, report in current.items():
+        base = baseline.get(solver)
+        if base is None:
+            continue
+        for n, stats in report["sizes"].items():
+            base_stats = base["sizes"].get(n)
+            if base_stats is None:
+                continue
+            if base_stats.get("corpus_sha256") != stats.get("corpus_sha256"):
+                regressions.append((solver, n, "corpus", None, None))
+                continue
+            for metric in GATED_METRICS:
+                old, new = base_stats.get(metric), stats.get(metric)
+                if old is None or new is None:
+                    continue
+                change = (new - old) / old if old > 0 else 0.0
+                rows.append((solver, n, metric, old, new, change))
+                if change > margin:
+                    regressions.append((solver, n, metric, old, new))
+            if (stats["success_rate"] or 0) < (base_stats["success_rate"] or 0) - 1e-9:
+                regressions.append((solver, n, "success_rate", base_stats["success_rate"], stats["success_rate"]))
+
+    for solver, n, metric, old, new, change in rows:
+        print(f"{solver:<10} n={n:<2} {metric:<12} {old:>10.5f} -> {new:>10.5f}  {change:+7.1%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Evaluations.benchmark_suite",
+                                     description="Reproducible solver benchmarks on a saved, seeded corpus")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="benchmark directory (corpus/ and reports/)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="write the seeded puzzle corpus")
+    gen.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    gen.add_argument("--count", type=int, default=20)
+    gen.add_argument("--seed", type=int, default=DEFAULT_SEED)
+
+    run = sub.add_parser("run", help="benchmark solvers on the corpus and write per-solver JSON reports")
+    run.add_argument("--solvers", nargs="+", default=list(ALGORITHMS))
+    run.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    run.add_argument("--timeout", type=float, default=60)
+    run.add_argument("--limit", type=int, default=None, help="puzzles per size (default: whole corpus)")
+    run.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    run.add_argument("--label", default=None, help="report directory name (default: timestamp)")
+    run.add_argument("--profile", action="store_true",
+                     help="extra cProfile pass; writes profiles/ and ranked hot functions next to the reports")
+
+    cmp = sub.add_parser("compare", help="flag regressions against a baseline report")
+    cmp.add_argument("baseline", help="baseline report directory")
+    cmp.add_argument("current", help="current report directory")
+    cmp.add_argument("--margin", type=float, default=0.10, help="allowed relative slowdown (default 0.10)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        manifest = generate_corpus(args.dir, args.sizes, args.count, args.seed)
+        print(json.dumps(manifest, indent=2))
+        return 0
+
+    if args.command == "run":
+        out_dir, _ = run_benchmark(args.dir, args.solvers, args.sizes, args.timeout, args.limit,
+                                   memory=not args.no_memory, label=args.label, profile=args.profile)
+        print(out_dir)
+        return 0
+
+    regressions = compare(args.baseline, args.current, args.margin)
+    for solver, n, metric, old, new in regressions:
+        print(f"REGRESSION {solver} n={n} {metric}: {old} -> {new}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,22 +1,24 @@
 from CluesGenerator.clues_generator import RandomPuzzleGenerator
-from Controller.puzzle_manager import PuzzleManager
+from Controller.profiling import aggregate_profiles
+from Controller.solvers import ALGORITHMS
+from Evaluations.sampling_stats import distribution, mean_ci, paired_difference, relative_half_width
+from Evaluations.worker_pool import IsolatedWorkerPool
 from statistics import mean, stdev
-import multiprocessing as mp
-
-def _isolated_run(data, algorithm, return_dict):
-    try:
-        manager = PuzzleManager(data, algorithm)
-        result, metrics = manager.run()
-        return_dict["result"] = result
-        return_dict["metrics"] = metrics
-    except Exception as e:
-        return_dict["error"] = str(e)
+import os
 
 
 class Evaluator:
-    def __init__(self, n: int, threshold: float):
+    def __init__(self, n: int, threshold: float, profile_dir=None, phase_timers=True, shared_memory=False):
         self.__n = n
         self.__threshold = threshold
+        self.__pool = None
+        # opt-in: every solve runs under cProfile and its .prof file is kept per algorithm
+        self.__profile_dir = profile_dir
+        self.__profile_paths = {}
+        # phase_timers=False runs the solvers with instrumentation's no-op mode
+        self.__phase_timers = phase_timers
+        # puzzles and boards cross to the workers through a SharedPuzzleBuffer instead of pickles
+        self.__shared_memory = shared_memory
 
         self.__csp_time = []
         self.__a_star_time = []
@@ -33,24 +35,26 @@ class Evaluator:
         }
 
     def __run_with_isolation(self, data, algorithm, timeout_sec=180):
-        manager = mp.Manager()
-        return_dict = manager.dict()
-
-        p = mp.Process(target=_isolated_run, args=(data, algorithm, return_dict))
-        p.start()
-        p.join(timeout_sec)
+        status, result, metrics, elapsed = self.__pool.run(data, algorithm, timeout_sec)
+        self.__record_profile(algorithm, metrics)
 
-        if p.is_alive():
+        if status == "timeout":
             print(f"[TIMEOUT] {algorithm} exceeded {timeout_sec} sec → killing.")
-            p.kill()
-            p.join()
             return None, None
 
-        if "error" in return_dict:
-            print(f"[ERROR] {algorithm} crashed: {return_dict['error']}")
+        if status != "ok":
+            error = metrics.get("error") if metrics else "worker process died"
+            print(f"[ERROR] {algorithm} crashed: {error}")
+            return None, None
+
+        if metrics is not None and metrics.get("timed_out"):
+            print(f"[TIMEOUT] {algorithm} exceeded {timeout_sec} sec → stopped.")
             return None, None
 
-        return return_dict.get("result"), return_dict.get("metrics")
+        if metrics is not None:
+            # full-precision wall time measured inside the worker, accurate for sub-millisecond solves
+            metrics = {**metrics, "runtime_sec": elapsed}
+        return result, metrics
 
     def __add_values(self):
         puzzle_generator = RandomPuzzleGenerator(self.__n)
@@ -99,8 +103,12 @@ class Evaluator:
         return False
 
     def evaluate_algorithms(self):
-        while not (self.__csp_done and self.__a_star_done and self.__hill_done):
-            self.__add_values()
+        with IsolatedWorkerPool(profile_dir=self.__profile_dir, phase_timers=self.__phase_timers,
+                                shared_memory=self.__shared_memory) as pool:
+            self.__pool = pool
+            while not (self.__csp_done and self.__a_star_done and self.__hill_done):
+                self.__add_values()
+        self.__pool = None
 
         def safe_stats(lst):
             return (mean(lst) if lst else None,
@@ -111,3 +119,79 @@ class Evaluator:
             *safe_stats(self.__a_star_time),
             *safe_stats(self.__hill_time),
         )
+
+    def evaluate_paired(self, algorithms=ALGORITHMS, relative_precision=0.05, confidence=0.95,
+                        min_samples=10, max_samples=300, timeout_sec=180, workers=None):
+        """
+        Run every algorithm on the same random puzzles, in parallel across cores, until the
+        confidence interval of each algorithm's mean runtime is within `relative_precision`
+        of the mean. Returns per-algorithm runtime and node distributions and success rates, plus paired
+        differences with bootstrap confidence intervals.
+        """
+        algorithms = list(algorithms)
+        runtimes = {algorithm: [] for algorithm in algorithms}
+        nodes = {algorithm: [] for algorithm in algorithms}
+        workers = workers or min(len(algorithms), os.cpu_count() or 1)
+
+        with IsolatedWorkerPool(workers, profile_dir=self.__profile_dir, phase_timers=self.__phase_timers,
+                                shared_memory=self.__shared_memory) as pool:
+            while True:
+                puzzle_generator = RandomPuzzleGenerator(self.__n)
+                data = {"n": self.__n, "clues": puzzle_generator.generate()}
+                outcomes = pool.run_all([(data, algorithm) for algorithm in algorithms], timeout_sec)
+
+                for algorithm, (status, result, metrics, elapsed) in zip(algorithms, outcomes):
+                    self.__record_profile(algorithm, metrics)
+                    solved = status == "ok" and result is not None and not metrics.get("timed_out")
+                    runtimes[algorithm].append(elapsed if solved else None)
+                    if solved:
+                        nodes[algorithm].append(metrics.get("nodes_expanded", 0))
+
+                samples = len(runtimes[algorithms[0]])
+                if samples >= max_samples:
+                    break
+                if samples >= min_samples and all(
+                        self.__precise_enough(runtimes[a], relative_precision, confidence) for a in algorithms):
+                    break
+
+        report = {"n": self.__n, "samples": samples, "confidence": confidence, "algorithms": {}, "paired": {}}
+        for algorithm in algorithms:
+            solved = [t for t in runtimes[algorithm] if t is not None]
+            report["algorithms"][algorithm] = {
+                "success_rate": len(solved) / samples,
+                "mean_ci": mean_ci(solved, confidence),
+                "relative_half_width": relative_half_width(solved, confidence),
+                "distribution": distribution(solved),
+                "nodes_expanded": distribution(nodes[algorithm]),
+            }
+        for i, first in enumerate(algorithms):
+            for second in algorithms[i + 1:]:
+                report["paired"][f"{first} - {second}"] = paired_difference(
+                    runtimes[first], runtimes[second], confidence)
+        if self.__profile_dir is not None:
+            report["hot_functions"] = self.profile_report()
+        return report
+
+    def profile_report(self, limit=15):
+        """
+        Aggregate the profiles collected so far into <profile_dir>/<algorithm>-n<n>.prof and
+        .hot.json files and return the ranked hot functions per algorithm.
+        """
+        report = {}
+        for algorithm, paths in self.__profile_paths.items():
+            name = algorithm.replace("*", "star").lower()
+            prefix = os.path.join(self.__profile_dir, f"{name}-n{self.__n}")
+            report[algorithm] = aggregate_profiles(paths, prefix, limit)
+        return report
+
+    def __record_profile(self, algorithm, metrics):
+        if metrics and metrics.get("profile_path"):
+            self.__profile_paths.setdefault(algorithm, []).append(metrics["profile_path"])
+
+    @staticmethod
+    def __precise_enough(samples, relative_precision, confidence):
+        solved = [t for t in samples if t is not None]
+        if not solved:
+            # an algorithm that never succeeds cannot narrow its interval; do not wait on it
+            return True
+        return relative_half_width(solved, confidence) <= relative_precision
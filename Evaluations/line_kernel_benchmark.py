@@ -0,0 +1,95 @@
+import argparse
+import itertools
+import random
+import time
+import timeit
+
+from SharedFunctions.line_kernel import (_CANDIDATES, _TABLES, candidate_lines, line_visibility,
+                                         visibility_array, visibility_batch)
+from SharedFunctions.shared_functions import visible_count
+
+
+def _reference_candidates(n, front, back):
+    # the pre-kernel enumeration: every permutation, two visible_count calls each
+    return tuple(p for p in itertools.permutations(range(1, n + 1))
+                 if (not front or visible_count(p) == front) and (not back or visible_count(p[::-1]) == back))
+
+
+def _lines(n, count, rng):
+    perms = [rng.sample(range(1, n + 1), n) for _ in range(count)]
+    # partial lines with empty cells, as in A* states, and columns with duplicates, as in HillClimb grids
+    partial = [[v if rng.random() < 0.6 else 0 for v in p] for p in perms]
+    dupes = [[rng.randint(1, n) for _ in range(n)] for _ in range(count)]
+    return {"permutation": perms, "partial": partial, "duplicates": dupes}
+
+
+def _rate(fn, batches):
+    # every batch is timed once, so nothing a function may keep from an earlier run is reused
+    best = None
+    for items in batches:
+        start = time.perf_counter()
+        fn(items)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(batches[0]) / best
+
+
+def bench_lines(n, count, repeats, rng):
+    draws = [_lines(n, count, rng) for _ in range(3 * repeats)]
+    rows = []
+    for kind in draws[0]:
+        batches = [draw[kind] for draw in draws]
+        before = _rate(lambda ls: [(visible_count(l), visible_count(reversed(l))) for l in ls],
+                       batches[:repeats])
+        after = _rate(lambda ls: [line_visibility(l) for l in ls], batches[repeats:2 * repeats])
+        batch = _rate(visibility_batch, batches[2 * repeats:])
+        rows.append((f"n={n} {kind}", before, after, batch))
+    return rows
+
+
+def bench_numpy(n, count, repeats, rng):
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    lines = np.array([rng.sample(range(1, n + 1), n) for _ in range(count)], dtype=np.int8)
+    return _rate(visibility_array, [lines] * repeats)
+
+
+def bench_candidates(n):
+    clue_pairs = [(f, b) for f in range(0, n + 1) for b in range(0, n + 1) if f + b <= n + 1]
+    before = min(timeit.repeat(lambda: [_reference_candidates(n, f, b) for f, b in clue_pairs], number=1, repeat=1))
+    _TABLES.pop(n, None)
+    for key in [k for k in _CANDIDATES if k[0] == n]:
+        del _CANDIDATES[key]
+    after = min(timeit.repeat(lambda: [candidate_lines(n, f, b) for f, b in clue_pairs], number=1, repeat=1))
+    return len(clue_pairs), before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calls per second of visible_count versus the shared line kernel")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 5, 7, 9])
+    parser.add_argument("--lines", type=int, default=20000, help="lines per measurement")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--candidates", type=int, nargs="*", default=[6, 7, 8],
+                        help="sizes for the clue-pair candidate generation benchmark")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'lines':<22} {'visible_count /s':>17} {'kernel /s':>12} {'batch /s':>12} {'speedup':>8}")
+    for n in args.sizes:
+        for name, before, after, batch in bench_lines(n, args.lines, args.repeats, rng):
+            print(f"{name:<22} {before:>17,.0f} {after:>12,.0f} {batch:>12,.0f} {after / before:>7.1f}x")
+        numpy_rate = bench_numpy(n, args.lines, args.repeats, rng)
+        if numpy_rate is not None:
+            print(f"{f'n={n} numpy array':<22} {'':>17} {'':>12} {numpy_rate:>12,.0f}")
+
+    if args.candidates:
+        print(f"\n{'candidate lines':<22} {'clue pairs':>10} {'before s':>10} {'kernel s':>10} {'speedup':>8}")
+        for n in args.candidates:
+            pairs, before, after = bench_candidates(n)
+            print(f"{f'n={n}':<22} {pairs:>10} {before:>10.3f} {after:>10.3f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
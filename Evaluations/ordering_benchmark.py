@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+from statistics import mean
+
+from CluesGenerator.clues_generator import RandomPuzzleGenerator
+from Controller.solvers import solve_puzzle
+from SharedFunctions.deadline import Deadline
+from SharedFunctions.ordering_table import CHOSEN, FAILED, TRIED, OrderingCounts, OrderingTable
+from SharedFunctions.trace import ASSIGN, BACKTRACK, TraceRecorder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# events kept per training solve; a longer search only contributes its latest events
+TRACE_CAPACITY = 1 << 18
+
+
+def _clue_key(clues):
+    return json.dumps({d: [int(x) if x not in ("", None) else 0 for x in clues[d]] for d in sorted(clues)})
+
+
+def held_out(n, limit=None):
+    """The seeded benchmark corpus for size n; the table is never built from these."""
+    path = os.path.join(ROOT, "benchmarks", "corpus", f"n{n}.jsonl")
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return records[:limit]
+
+
+def training_records(sizes, count, seed):
+    """Generated puzzles with their solutions; any that coincide with a held-out puzzle are skipped."""
+    for n in sizes:
+        excluded = {_clue_key(record["clues"]) for record in held_out(n)}
+        generator = RandomPuzzleGenerator(n, seed=seed * 100 + n)
+        for _ in range(count):
+            clues, grid = generator.generate_with_solution()
+            if _clue_key(clues) not in excluded:
+                yield {"n": n, "clues": clues, "solution": grid}
+
+
+def _line_keys(clues, r, c):
+    """(front, back, position) of cell (r, c) in its row and in its column."""
+    return ((clues["left"][r], clues["right"][r], c), (clues["top"][c], clues["bottom"][c], r))
+
+
+def build_table(records, path, timeout=10.0, solve=True):
+    """
+    Count, per (n, clue pair, position, value), the solutions' values and, with solve=True, the
+    values a traced CSP search assigned and later undid. Returns the number of puzzles used.
+    """
+    counts = OrderingCounts()
+    used = 0
+    for record in records:
+        n, clues = record["n"], record["clues"]
+        for r, row in enumerate(record["solution"]):
+            for c, v in enumerate(row):
+                for front, back, position in _line_keys(clues, r, c):
+                    counts.add(CHOSEN, n, front, back, position, v)
+
+        if solve:
+            trace = TraceRecorder(capacity=TRACE_CAPACITY)
+            data = {"n": n, "clues": {d: list(v) for d, v in clues.items()}}
+            solve_puzzle(data, "CSP", Deadline(timeout), phase_timers=False, trace=trace)
+            for event in trace.events():
+                if event.kind in (ASSIGN, BACKTRACK):
+                    field = TRIED if event.kind == ASSIGN else FAILED
+                    for front, back, position in _line_keys(clues, event.r, event.c):
+                        counts.add(field, n, front, back, position, event.value)
+        used += 1
+
+    counts.write(path)
+    return used
+
+
+def node_counts(records, timeout, ordering=None, use_preprocessing=True):
+    """(solved, nodes expanded, backtracks, runtime) of a CSP solve per record."""
+    rows = []
+    for record in records:
+        data = {"n": record["n"], "clues": {d: list(v) for d, v in record["clues"].items()}}
+        result, metrics = solve_puzzle(data, "CSP", Deadline(timeout), use_preprocessing=use_preprocessing,
+                                       phase_timers=False, ordering=ordering)
+        rows.append((result is not None, metrics.get("nodes_expanded", 0), metrics.get("backtracks", 0),
+                     metrics.get("runtime_sec", 0.0)))
+    return rows
+
+
+def build(args):
+    if args.records:
+        def records():
+            for path in args.records:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+        source = records()
+    else:
+        source = training_records(args.sizes, args.count, args.seed)
+    used = build_table(source, args.output, timeout=args.timeout, solve=not args.no_solve)
+    print(json.dumps({"table": args.output, "puzzles": used, "bytes": os.path.getsize(args.output)}))
+
+
+def run(args):
+    table = OrderingTable(args.table)
+    use_preprocessing = not args.no_preprocessing
+    print(f"CSP on the held-out corpus, {args.limit or 'all'} puzzles per size, table {args.table}, "
+          f"preprocessing {'on' if use_preprocessing else 'off'}")
+    print(f"{'n':>2} {'ordering':<8} {'solved':>6} {'expanded':>9} {'backtracks':>10} {'mean s':>8} {'changed':>8}")
+    for n in args.sizes:
+        records = held_out(n, args.limit)
+        results = {label: node_counts(records, args.timeout, ordering, use_preprocessing)
+                   for label, ordering in (("none", None), ("table", table))}
+        # puzzles whose search effort the table changed, either way
+        changed = sum(a[1:3] != b[1:3] for a, b in zip(results["none"], results["table"]))
+        for label, rows in results.items():
+            solved = sum(ok for ok, _, _, _ in rows)
+            expanded = sum(e for _, e, _, _ in rows)
+            backtracks = sum(b for _, _, b, _ in rows)
+            runtime = mean(t for _, _, _, t in rows)
+            print(f"{n:>2} {label:<8} {solved:>6} {expanded:>9} {backtracks:>10} {runtime:>8.3f} "
+                  f"{changed if label == 'table' else '':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a learned value-ordering table, and compare CSP search "
+                                                 "effort with and without it on the held-out corpus")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    b = commands.add_parser("build", help="build a table from solved puzzles")
+    b.add_argument("records", nargs="*", help="JSON Lines with n, clues and solution (default: generate)")
+    b.add_argument("--sizes", type=int, nargs="+", default=[6, 7, 8])
+    b.add_argument("--count", type=int, default=60, help="generated puzzles per size")
+    b.add_argument("--seed", type=int, default=7, help="generator seed; keep it apart from the corpus seed")
+    b.add_argument("--timeout", type=float, default=10.0, help="per-puzzle budget of the traced CSP solve")
+    b.add_argument("--no-solve", action="store_true", help="count solution values only, skip the CSP traces")
+    b.add_argument("-o", "--output", default="ordering.bin")
+    b.set_defaults(run=build)
+
+    r = commands.add_parser("run", help="CSP node counts and backtracks with and without a table")
+    r.add_argument("table")
+    r.add_argument("--sizes", type=int, nargs="+", default=[6, 7, 8])
+    r.add_argument("--no-preprocessing", action="store_true", help="start CSP from full domains")
+    r.add_argument("--limit", type=int, default=None, help="puzzles per size")
+    r.add_argument("--timeout", type=float, default=30.0)
+    r.set_defaults(run=run)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import random
+import time
+from statistics import mean, median
+
+from CluesGenerator.clues_generator import RandomPuzzleGenerator
+from Controller.preprocessing import preprocess
+from Controller.solvers import ALGORITHMS, run_solver
+from SharedFunctions.deadline import Deadline
+
+
+def benchmark(sizes, puzzles_per_size, timeout, seed):
+    rows = []
+    for n in sizes:
+        random.seed(seed + n)
+        puzzles = [{"n": n, "clues": RandomPuzzleGenerator(n).generate()} for _ in range(puzzles_per_size)]
+
+        for algorithm in ALGORITHMS:
+            timings = {False: [], True: []}
+            timeouts = {False: 0, True: 0}
+            preprocess_sec = []
+            for data in puzzles:
+                for use_facts in (False, True):
+                    # solve_puzzle pays for preprocess() on every solve, so the "on" time includes it
+                    start = time.perf_counter()
+                    facts = preprocess(data) if use_facts else None
+                    setup = time.perf_counter() - start
+                    if use_facts:
+                        preprocess_sec.append(setup)
+                    result, metrics = run_solver(data, algorithm, Deadline(timeout), facts)
+                    if metrics.get("timed_out"):
+                        timeouts[use_facts] += 1
+                    # a timed-out run is counted at the full budget
+                    runtime = metrics.get("runtime_sec", timeout) if result is not None else timeout
+                    timings[use_facts].append(setup + runtime)
+
+            rows.append((n, algorithm, timings, timeouts, preprocess_sec))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solver runtime with and without clue preprocessing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 5, 6])
+    parser.add_argument("--puzzles", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    # "on" is preprocess() plus the solve; "preprocess" is the mean of preprocess() alone
+    print(f"{'n':>2}  {'algorithm':<10} {'mean off':>10} {'mean on':>10} {'median off':>11} {'median on':>10} "
+          f"{'preprocess':>11} {'speedup':>8} {'timeouts':>9}")
+    for n, algorithm, timings, timeouts, preprocess_sec in benchmark(args.sizes, args.puzzles, args.timeout,
+                                                                     args.seed):
+        off, on = mean(timings[False]), mean(timings[True])
+        speedup = off / on if on > 0 else float("inf")
+        print(f"{n:>2}  {algorithm:<10} {off:>10.4f} {on:>10.4f} {median(timings[False]):>11.4f} "
+              f"{median(timings[True]):>10.4f} {mean(preprocess_sec):>11.4f} {speedup:>7.1f}x "
+              f"{timeouts[False]:>4}/{timeouts[True]:<4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import random
+from statistics import NormalDist, mean, stdev
+
+
+def t_critical(confidence, df):
+    """Two-sided Student t quantile, via the first Cornish-Fisher correction to the normal quantile."""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    if df <= 0:
+        return float("inf")
+    return z + (z ** 3 + z) / (4 * df)
+
+
+def mean_ci(samples, confidence=0.95):
+    if len(samples) < 2:
+        return None
+    m = mean(samples)
+    half = t_critical(confidence, len(samples) - 1) * stdev(samples) / len(samples) ** 0.5
+    return m - half, m + half
+
+
+def relative_half_width(samples, confidence=0.95):
+    ci = mean_ci(samples, confidence)
+    if ci is None:
+        return float("inf")
+    m = mean(samples)
+    if m == 0:
+        return 0.0 if ci[0] == ci[1] else float("inf")
+    return (ci[1] - ci[0]) / 2 / abs(m)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def distribution(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": mean(ordered),
+        "sd": stdev(ordered) if len(ordered) > 1 else None,
+        "min": ordered[0],
+        "p10": percentile(ordered, 0.10),
+        "p25": percentile(ordered, 0.25),
+        "median": percentile(ordered, 0.50),
+        "p75": percentile(ordered, 0.75),
+        "p90": percentile(ordered, 0.90),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+    }
+
+
+def bootstrap_ci(values, statistic=mean, confidence=0.95, resamples=2000, seed=0):
+    if len(values) < 2:
+        return None
+    rng = random.Random(seed)
+    k = len(values)
+    stats = sorted(statistic([values[rng.randrange(k)] for _ in range(k)]) for _ in range(resamples))
+    alpha = (1 - confidence) / 2
+    return percentile(stats, alpha), percentile(stats, 1 - alpha)
+
+
+def paired_difference(a, b, confidence=0.95, resamples=2000, seed=0):
+    """Summary of a[i] - b[i] over pairs where both values are present."""
+    diffs = [x - y for x, y in zip(a, b) if x is not None and y is not None]
+    if not diffs:
+        return {"pairs": 0}
+    ratios = sorted(x / y for x, y in zip(a, b) if x is not None and y is not None and y > 0)
+    return {
+        "pairs": len(diffs),
+        "mean_diff": mean(diffs),
+        "mean_diff_ci": bootstrap_ci(diffs, mean, confidence, resamples, seed),
+        "median_diff": percentile(sorted(diffs), 0.5),
+        "median_diff_ci": bootstrap_ci(diffs, lambda xs: percentile(sorted(xs), 0.5), confidence, resamples, seed),
+        "median_ratio": percentile(ratios, 0.5),
+        "first_faster_share": sum(1 for d in diffs if d < 0) / len(diffs),
+    }
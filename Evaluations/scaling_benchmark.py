@@ -0,0 +1,207 @@
+import argparse
+import json
+import multiprocessing as mp
+import random
+import resource
+import sys
+import threading
+import time
+
+from CluesGenerator.clues_generator import RandomPuzzleGenerator
+from Controller.solvers import ALGORITHMS, solve_puzzle
+from Evaluations.sampling_stats import percentile
+from SharedFunctions.deadline import Deadline
+
+DEFAULT_SIZES = tuple(range(4, 11))
+DEFAULT_SEED = 20240601
+# extra time a child gets to honour its deadline before it is killed
+KILL_GRACE_SEC = 5
+# how often the in-process watchdog samples peak RSS against the memory budget
+RSS_POLL_SEC = 0.02
+# a solver counts as usable for a size when it solves at least this share within budget
+USABLE_SUCCESS_RATE = 0.9
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(conn, data, algorithm, time_budget, memory_budget, seed):
+    """Child process: one solve under both budgets. Exceeding the memory budget cancels the solver's deadline."""
+    random.seed(seed)
+    baseline = peak_rss_bytes()
+    over_memory = threading.Event()
+    deadline = Deadline(time_budget, event=over_memory)
+    done = threading.Event()
+
+    def watchdog():
+        while not done.wait(RSS_POLL_SEC):
+            if peak_rss_bytes() - baseline > memory_budget:
+                over_memory.set()
+                return
+
+    threading.Thread(target=watchdog, daemon=True).start()
+    start = time.perf_counter_ns()
+    try:
+        result, metrics = solve_puzzle(data, algorithm, deadline)
+    except MemoryError:
+        result, metrics = None, {"error": "MemoryError"}
+        over_memory.set()
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    done.set()
+
+    conn.send({
+        "solved": result is not None,
+        "timed_out": bool(metrics.get("timed_out")) and not over_memory.is_set(),
+        "over_memory": over_memory.is_set(),
+        "runtime_sec": elapsed,
+        "nodes": metrics.get("nodes_expanded"),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "solver_rss_bytes": max(0, peak_rss_bytes() - baseline),
+    })
+    conn.close()
+
+
+def measure(data, algorithm, time_budget, memory_budget, seed, ctx=None):
+    """Run one solve in a fresh process so its peak RSS is its own; returns the sample dict."""
+    ctx = ctx or mp.get_context()
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_measure, args=(child_conn, data, algorithm, time_budget, memory_budget, seed),
+                          daemon=True)
+    process.start()
+    child_conn.close()
+
+    sample = None
+    if parent_conn.poll(time_budget + KILL_GRACE_SEC):
+        try:
+            sample = parent_conn.recv()
+        except EOFError:
+            pass
+    hung = process.is_alive() and sample is None
+    if process.is_alive():
+        process.kill()
+    process.join()
+    parent_conn.close()
+
+    if sample is None:
+        # either it ignored its deadline and was killed here, or it died on its own (usually the OOM killer)
+        return {"solved": False, "timed_out": hung, "over_memory": not hung, "runtime_sec": None,
+                "nodes": None, "peak_rss_bytes": None, "solver_rss_bytes": None, "killed": True}
+    return sample
+
+
+def _point(n, samples):
+    solved = [s for s in samples if s["solved"]]
+    runtimes = sorted(s["runtime_sec"] for s in solved)
+    nodes = sorted(s["nodes"] for s in solved if s["nodes"] is not None)
+    rss = sorted(s["peak_rss_bytes"] for s in samples if s["peak_rss_bytes"] is not None)
+    solver_rss = sorted(s["solver_rss_bytes"] for s in samples if s["solver_rss_bytes"] is not None)
+    return {
+        "n": n,
+        "puzzles": len(samples),
+        "solved": len(solved),
+        "success_rate": len(solved) / len(samples) if samples else None,
+        "timeouts": sum(1 for s in samples if s["timed_out"]),
+        "over_memory": sum(1 for s in samples if s["over_memory"]),
+        "runtime_p50": percentile(runtimes, 0.50),
+        "runtime_p95": percentile(runtimes, 0.95),
+        "nodes_p50": percentile(nodes, 0.50),
+        "nodes_p95": percentile(nodes, 0.95),
+        "peak_rss_mb_p50": _mb(percentile(rss, 0.50)),
+        "peak_rss_mb_max": _mb(rss[-1] if rss else None),
+        "solver_rss_mb_p50": _mb(percentile(solver_rss, 0.50)),
+        "solver_rss_mb_max": _mb(solver_rss[-1] if solver_rss else None),
+    }
+
+
+def _mb(value):
+    return None if value is None else round(value / (1 << 20), 2)
+
+
+def suggest_routing(curves):
+    """Per n, the usable solver with the lowest median runtime; None when no solver is usable."""
+    routing = {}
+    sizes = sorted({point["n"] for points in curves.values() for point in points})
+    for n in sizes:
+        best = None
+        for solver, points in curves.items():
+            point = next((p for p in points if p["n"] == n), None)
+            if point is None or (point["success_rate"] or 0) < USABLE_SUCCESS_RATE:
+                continue
+            if best is None or point["runtime_p50"] < best[1]:
+                best = (solver, point["runtime_p50"])
+        routing[str(n)] = best[0] if best else None
+    return routing
+
+
+def run_scaling(solvers, sizes, count, time_budget, memory_budget_mb, seed=DEFAULT_SEED, keep_going=False):
+    """
+    Solve `count` seeded puzzles per size with every solver, each in its own process. A solver
+    stops climbing sizes once it is no longer usable at one, unless keep_going is set.
+    """
+    memory_budget = memory_budget_mb * (1 << 20)
+    ctx = mp.get_context()
+    puzzles = {}
+    for n in sizes:
+        generator = RandomPuzzleGenerator(n, seed=seed * 100 + n)
+        puzzles[n] = [generator.generate() for _ in range(count)]
+
+    curves = {}
+    usable_max_n = {}
+    for solver in solvers:
+        curves[solver] = []
+        usable_max_n[solver] = None
+        for n in sizes:
+            samples = [measure({"n": n, "clues": clues}, solver, time_budget, memory_budget,
+                               seed * 100000 + n * 1000 + i, ctx)
+                       for i, clues in enumerate(puzzles[n])]
+            point = _point(n, samples)
+            curves[solver].append(point)
+            print(f"[{solver}] n={n}: {point['solved']}/{point['puzzles']} solved, "
+                  f"p50 {point['runtime_p50']} s, peak RSS {point['peak_rss_mb_max']} MB", file=sys.stderr)
+
+            if (point["success_rate"] or 0) >= USABLE_SUCCESS_RATE:
+                usable_max_n[solver] = n
+            elif not keep_going:
+                break
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "puzzles_per_size": count,
+        "budgets": {"time_sec": time_budget, "memory_mb": memory_budget_mb},
+        "usable_success_rate": USABLE_SUCCESS_RATE,
+        "curves": curves,
+        "usable_max_n": usable_max_n,
+        "routing": suggest_routing(curves),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Evaluations.scaling_benchmark",
+                                     description="Runtime, node and peak-RSS scaling curves per solver and board size")
+    parser.add_argument("--solvers", nargs="+", default=list(ALGORITHMS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--count", type=int, default=5, help="puzzles per size")
+    parser.add_argument("--time-budget", type=float, default=60, help="seconds per solve")
+    parser.add_argument("--memory-budget", type=float, default=1024, help="MB of RSS growth per solve")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--keep-going", action="store_true", help="measure larger sizes after a solver fails")
+    parser.add_argument("-o", "--output", default=None, help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_scaling(args.solvers, sorted(args.sizes), args.count, args.time_budget, args.memory_budget,
+                         args.seed, args.keep_going)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# each entry point is imported in a fresh interpreter, like a newly started worker process
+ENTRY_POINTS = {
+    "interpreter": "",
+    "main (headless)": "import main",
+    "solver core": "import Controller.puzzle_manager",
+    "evaluator": "import Evaluations.evaluator",
+    "batch cli": "import Controller.batch_cli",
+    "gui": "import GUI.app",
+}
+
+_PROBE = """
+import resource, time, json
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_sec": elapsed, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def measure(statement, repeats):
+    samples = []
+    for _ in range(repeats):
+        proc = subprocess.run([sys.executable, "-c", _PROBE.format(statement=statement)],
+                              cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None
+        samples.append(json.loads(proc.stdout))
+    return {
+        "import_ms": round(1000 * median(s["import_sec"] for s in samples), 2),
+        "max_rss_mb": round(median(s["max_rss_kb"] for s in samples) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time and RSS per entry point")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entry point':<18} {'import ms':>10} {'max RSS MB':>11}")
+    for name, statement in ENTRY_POINTS.items():
+        result = measure(statement, args.repeats)
+        if result is None:
+            print(f"{name:<18} {'unavailable (import failed)':>22}")
+            continue
+        print(f"{name:<18} {result['import_ms']:>10} {result['max_rss_mb']:>11}")
+
+
+if __name__ == "__main__":
+    main()
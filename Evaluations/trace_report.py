@@ -0,0 +1,68 @@
+import argparse
+import itertools
+import json
+from collections import deque
+
+from Controller.puzzle_manager import PuzzleManager
+from SharedFunctions.trace import TraceRecorder, describe, read_header, read_trace, summarize
+
+
+def record(args):
+    with open(args.puzzles, "r", encoding="utf-8") as f:
+        line = next(itertools.islice((line for line in f if line.strip()), args.index, None))
+    data = json.loads(line)
+    puzzle = {"n": data["n"], "clues": data["clues"]}
+    if data.get("grid"):
+        puzzle["grid"] = data["grid"]
+
+    with TraceRecorder(args.output) as trace:
+        _, metrics = PuzzleManager(puzzle, args.algorithm, timeout=args.timeout, trace=trace).run()
+    print(json.dumps({"trace": args.output, "events": trace.count, "success": metrics.get("success")}))
+
+
+def summary(args):
+    n, solver = read_header(args.trace)
+    # a single streaming pass; only the last --tail events are kept
+    first = []
+    last = deque(maxlen=args.tail)
+
+    def remember(events):
+        for event in events:
+            if len(first) < args.head:
+                first.append(event)
+            last.append(event)
+            yield event
+
+    report = {"n": n, "solver": solver, **summarize(remember(read_trace(args.trace)))}
+    print(json.dumps(report, indent=2))
+    for title, events in (("first", first), ("last", last)):
+        if events:
+            print(f"\n{title} {len(events)} events:")
+            for event in events:
+                print(f"  {describe(event)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a solver trace, or summarise one without loading it whole")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="solve one puzzle from a JSON Lines file and write its trace")
+    rec.add_argument("puzzles")
+    rec.add_argument("-i", "--index", type=int, default=0, help="puzzle line to solve (0-based)")
+    rec.add_argument("-a", "--algorithm", default="CSP", choices=["CSP", "A*", "HillClimb"])
+    rec.add_argument("-t", "--timeout", type=float, default=180)
+    rec.add_argument("-o", "--output", default="trace.bin")
+    rec.set_defaults(run=record)
+
+    summ = commands.add_parser("summary", help="event counts and extremes, plus the first and last events")
+    summ.add_argument("trace")
+    summ.add_argument("--head", type=int, default=10)
+    summ.add_argument("--tail", type=int, default=10)
+    summ.set_defaults(run=summary)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
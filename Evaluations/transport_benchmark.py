@@ -0,0 +1,90 @@
+import argparse
+import itertools
+import json
+import os
+import pickle
+import time
+
+from Controller.batch import BatchRun, shutdown_pools
+from Evaluations.worker_pool import IsolatedWorkerPool
+from SharedFunctions.shared_puzzles import SLOT_BYTES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _puzzles(n, count):
+    # the seeded corpus, cycled to the requested count; copies, since validation converts clues in place
+    path = os.path.join(ROOT, "benchmarks", "corpus", f"n{n}.jsonl")
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [{"n": n, "clues": {d: list(v) for d, v in record["clues"].items()}}
+            for record in itertools.islice(itertools.cycle(records), count)]
+
+
+def bench_batch(puzzles, algorithm, workers, chunk_size, shared_memory):
+    run = BatchRun(iter(puzzles), algorithm, workers=workers, chunk_size=chunk_size, phase_timers=False,
+                   shared_memory=shared_memory)
+    start = time.perf_counter()
+    solved = sum(1 for _, result, _ in run if result is not None)
+    return time.perf_counter() - start, solved
+
+
+def bench_pool(puzzles, algorithm, workers, shared_memory):
+    with IsolatedWorkerPool(workers, phase_timers=False, shared_memory=shared_memory) as pool:
+        start = time.perf_counter()
+        outcomes = pool.run_all([(data, algorithm) for data in puzzles])
+        elapsed = time.perf_counter() - start
+    return elapsed, sum(1 for _, result, _, _ in outcomes if result is not None)
+
+
+def payload_bytes(data, result):
+    """Bytes pickled per puzzle by each transport, for the puzzle and the board (metrics travel either way)."""
+    pickled = len(pickle.dumps(data)) + len(pickle.dumps(result))
+    shared = len(pickle.dumps(("psm_0123abcd", 10000, 9999))) + len(pickle.dumps(None))
+    return pickled, shared
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pickled puzzles and boards versus the shared-memory transport")
+    parser.add_argument("--count", type=int, default=10000, help="puzzles per measurement (corpus cycled)")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--algorithm", default="HillClimb", help="a fast solver keeps transport a visible share")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--paths", nargs="+", default=["batch", "pool"], choices=["batch", "pool"])
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    puzzles = _puzzles(args.size, args.count)
+    rows = []
+    for path in args.paths:
+        for shared_memory in (False, True):
+            best = None
+            for _ in range(args.repeats):
+                batch = [{"n": p["n"], "clues": {d: list(v) for d, v in p["clues"].items()}} for p in puzzles]
+                if path == "batch":
+                    elapsed, solved = bench_batch(batch, args.algorithm, workers, args.chunk_size, shared_memory)
+                else:
+                    elapsed, solved = bench_pool(batch, args.algorithm, workers, shared_memory)
+                best = elapsed if best is None else min(best, elapsed)
+            rows.append((path, "shared memory" if shared_memory else "pickle", best, solved))
+        shutdown_pools()
+
+    print(f"{args.count} puzzles, n={args.size}, {args.algorithm}, {workers} worker(s), best of {args.repeats}")
+    print(f"{'path':<8} {'transport':<14} {'wall s':>8} {'puzzles/s':>10} {'solved':>7}")
+    baseline = {}
+    for path, transport, elapsed, solved in rows:
+        baseline.setdefault(path, elapsed)
+        speedup = baseline[path] / elapsed
+        print(f"{path:<8} {transport:<14} {elapsed:>8.3f} {args.count / elapsed:>10,.0f} {solved:>7} {speedup:>6.2f}x")
+
+    from Controller.solvers import solve_puzzle
+    data = dict(puzzles[0])
+    result, _ = solve_puzzle(data, "CSP")
+    pickled, shared = payload_bytes(data, result)
+    print(f"\nper puzzle: {pickled} bytes pickled, or {shared} bytes pickled plus a {SLOT_BYTES}-byte slot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import cProfile
+import multiprocessing as mp
+import os
+import random
+import time
+import tracemalloc
+from multiprocessing.connection import wait
+
+from Controller.data_checking import validate_puzzle
+from Controller.solvers import solve_puzzle
+from SharedFunctions.deadline import Deadline
+from SharedFunctions.shared_puzzles import SharedPuzzleBuffer, attach, share_tracker
+
+# extra time a worker gets to honour its cooperative deadline before it is killed
+KILL_GRACE_SEC = 5
+
+
+def _worker_loop(conn):
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+
+        data, algorithm, timeout, trace_memory, seed, profile_path, phase_timers = task
+        # a (name, capacity, slot) reference: the puzzle and its solution live in shared memory
+        shared = None
+        if isinstance(data, tuple):
+            name, capacity, slot = data
+            shared = attach(name, capacity)
+            data = shared.puzzle(slot)
+        if seed is not None:
+            # stochastic solvers draw from the global RNG; seeding makes their runs reproducible
+            random.seed(seed)
+        try:
+            if trace_memory:
+                tracemalloc.start()
+            profiler = cProfile.Profile() if profile_path else None
+            start = time.perf_counter_ns()
+            if profiler is not None:
+                profiler.enable()
+            error = validate_puzzle(data)
+            if error is not None:
+                result, metrics = None, {"error": error}
+            else:
+                result, metrics = solve_puzzle(data, algorithm, Deadline(timeout), phase_timers=phase_timers)
+            if profiler is not None:
+                profiler.disable()
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+            if profiler is not None:
+                profiler.dump_stats(profile_path)
+                metrics = {**metrics, "profile_path": profile_path}
+            if trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                metrics = {**metrics, "traced_peak_bytes": peak}
+            if shared is not None:
+                shared.store(slot, result)
+                result = None
+            conn.send(("ok", result, metrics, elapsed))
+        except Exception as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            conn.send(("error", None, {"error": str(e)}, None))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class IsolatedWorkerPool:
+    """
+    Long-lived solver processes for the Evaluator. Tasks and results travel over pipes;
+    a worker is only replaced when it exceeds its timeout or crashes. With profile_dir set,
+    every solve runs under cProfile and its .prof path is returned in the metrics. With
+    phase_timers=False the solvers skip their per-phase timings. With shared_memory=True puzzles
+    are packed into a SharedPuzzleBuffer owned by the pool (kept across runs, regrown when a run
+    needs more slots) and workers write solutions back in place; only the metrics travel over
+    the pipes.
+    """
+
+    def __init__(self, workers=1, trace_memory=False, profile_dir=None, phase_timers=True, shared_memory=False):
+        self.__ctx = mp.get_context()
+        self.__trace_memory = trace_memory
+        self.__profile_dir = profile_dir
+        self.__phase_timers = phase_timers
+        self.__shared_memory = shared_memory
+        self.__shared = None
+        self.__profiled = 0
+        if profile_dir is not None:
+            os.makedirs(profile_dir, exist_ok=True)
+        if shared_memory:
+            share_tracker()
+        self.__workers = [_Worker(self.__ctx) for _ in range(workers)]
+        self.__respawns = 0
+
+    @property
+    def size(self):
+        return len(self.__workers)
+
+    @property
+    def respawns(self):
+        return self.__respawns
+
+    def run(self, data, algorithm, timeout_sec=180, seed=None):
+        return self.run_all([(data, algorithm, seed)], timeout_sec)[0]
+
+    def run_all(self, tasks, timeout_sec=180):
+        """
+        Run (data, algorithm[, seed]) tasks in parallel, at most one per worker at a time.
+        Returns one (status, result, metrics, elapsed_sec) per task, in task order;
+        status is "ok", "error", "timeout" or "crashed".
+        """
+        shared = self.__shared_buffer(len(tasks)) if self.__shared_memory else None
+        outcomes = [None] * len(tasks)
+        queue = list(enumerate(tasks))
+        busy = {}
+        idle = list(range(len(self.__workers)))
+        by_reference = set()
+
+        while queue or busy:
+            while queue and idle:
+                slot = idle.pop()
+                index, (data, algorithm, *seed) = queue.pop(0)
+                seed = seed[0] if seed else None
+                if shared is not None and SharedPuzzleBuffer.fits(data):
+                    shared.pack(index, data)
+                    data = (shared.name, shared.capacity, index)
+                    by_reference.add(index)
+                self.__workers[slot].conn.send(
+                    (data, algorithm, timeout_sec, self.__trace_memory, seed, self.__profile_path(algorithm),
+                     self.__phase_timers))
+                busy[slot] = (index, time.monotonic() + timeout_sec + KILL_GRACE_SEC)
+
+            now = time.monotonic()
+            wait_for = max(0.0, min(expires for _, expires in busy.values()) - now)
+            ready = wait([self.__workers[slot].conn for slot in busy], timeout=wait_for)
+
+            for slot in list(busy):
+                worker = self.__workers[slot]
+                index, expires = busy[slot]
+                if worker.conn in ready:
+                    try:
+                        outcomes[index] = worker.conn.recv()
+                        if index in by_reference and outcomes[index][0] == "ok":
+                            status, _, metrics, elapsed = outcomes[index]
+                            outcomes[index] = (status, shared.solution(index), metrics, elapsed)
+                    except (EOFError, OSError):
+                        outcomes[index] = ("crashed", None, None, None)
+                        self.__replace(slot)
+                elif time.monotonic() >= expires:
+                    outcomes[index] = ("timeout", None, None, None)
+                    self.__replace(slot)
+                else:
+                    continue
+                del busy[slot]
+                idle.append(slot)
+
+        return outcomes
+
+    def __shared_buffer(self, capacity):
+        if self.__shared is None or self.__shared.capacity < capacity:
+            if self.__shared is not None:
+                self.__shared.close()
+            self.__shared = SharedPuzzleBuffer(capacity)
+        return self.__shared
+
+    def __profile_path(self, algorithm):
+        if self.__profile_dir is None:
+            return None
+        self.__profiled += 1
+        name = algorithm.replace("*", "star").lower()
+        return os.path.join(self.__profile_dir, f"{name}-{self.__profiled:06d}.prof")
+
+    def __replace(self, slot):
+        self.__workers[slot].kill()
+        self.__workers[slot] = _Worker(self.__ctx)
+        self.__respawns += 1
+
+    def close(self):
+        for worker in self.__workers:
+            worker.stop()
+        self.__workers = []
+        if self.__shared is not None:
+            self.__shared.close()
+            self.__shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
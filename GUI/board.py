@@ -1,7 +1,14 @@
+import itertools
+import time
+
 import streamlit as st
 
-from CluesGenerator.clues_generator import RandomPuzzleGenerator
 from Controller.puzzle_manager import PuzzleManager
+from GUI.session_cache import get_puzzle_pool, get_solve_cache
+from SharedFunctions.trace import TraceRecorder, describe, replay, summarize
+
+# how often the page reruns to refresh the progress of a running solve
+PROGRESS_POLL_SEC = 0.5
 
 class Board:
     def __init__(self):
@@ -16,6 +23,8 @@ class Board:
 
         st.session_state.setdefault("solution", {})
         st.session_state.setdefault("metrics", {})
+        # start generating puzzles of the selected size before the user asks for one
+        get_puzzle_pool().warm(self.n)
 
     @staticmethod
     def __hard_reload():
@@ -46,6 +55,8 @@ class Board:
         self.__render_table()
         self.__render_buttons()
         Board.__render_metrics()
+        Board.__render_trace()
+        Board.__render_job()
 
     def __render_table(self):
         n = self.n
@@ -70,7 +81,8 @@ class Board:
                 st.text_input("", key=f"bottom_{c}", max_chars=1)
 
     def __render_buttons(self):
-        col1, col2, col3, col4 = st.columns(4)
+        st.checkbox("Record a solver trace (CSP, A*, Hill Climbing)", key="record_trace")
+        col1, col2, col3, col4, col5, col6 = st.columns(6)
         with col1:
             if st.button("CSP + AC3"):
                 self.__run_solver("CSP", "Puzzle solved with CSP + AC3!")
@@ -81,18 +93,70 @@ class Board:
             if st.button("Hill Climbing / SA"):
                 self.__run_solver("HillClimb", "Puzzle solved with Hill Climbing / SA!")
         with col4:
+            if st.button("Dancing Links"):
+                self.__run_solver("DLX", "Puzzle solved with Dancing Links!")
+        with col5:
+            if st.button("LNS Hybrid"):
+                self.__run_solver("LNS", "Puzzle solved with the LNS hybrid!")
+        with col6:
             if st.button("Generate Random Puzzle"):
-                generator = RandomPuzzleGenerator(self.n)
-                clues = generator.generate()
+                clues = get_puzzle_pool().take(self.n)
 
                 st.session_state["generated_clues"] = clues
                 st.session_state["force_reload"] = True
                 st.rerun()
 
     def __run_solver(self, solver_name, success_message):
+        # one background solve per session; starting another one stops the previous solver
+        previous = st.session_state.get("solve_job")
+        if previous is not None:
+            previous.cancel()
+
         data = self.__collect_data()
-        result, metrics = PuzzleManager(data, solver_name).run()
+        # a traced solve always runs, the cache has no trace to show
+        trace = TraceRecorder() if st.session_state.get("record_trace") else None
+        cached = get_solve_cache().lookup(data, solver_name) if trace is None else None
+        if cached is not None:
+            Board.__finish_solve(*cached, success_message)
+            return
 
+        st.session_state["solve_job"] = PuzzleManager(data, solver_name, trace=trace).run_in_background()
+        st.session_state["solve_job_info"] = (solver_name, data, success_message, trace)
+        st.rerun()
+
+    @staticmethod
+    def __render_job():
+        job = st.session_state.get("solve_job")
+        if job is None:
+            return
+
+        solver_name, data, success_message, trace = st.session_state["solve_job_info"]
+        if not job.done():
+            progress = job.progress()
+            if progress["state"] == "queued":
+                st.subheader(f"{solver_name} is waiting for a free solver thread…")
+            else:
+                st.subheader(f"Solving with {solver_name}…")
+            figures = {k: v for k, v in progress.items() if k != "state"}
+            st.write("  |  ".join(f"{k.replace('_', ' ')}: {v}" for k, v in figures.items()))
+            if job.cancelled:
+                st.write("Cancelling…")
+            elif st.button("Cancel"):
+                job.cancel()
+            time.sleep(PROGRESS_POLL_SEC)
+            st.rerun()
+
+        del st.session_state["solve_job"]
+        del st.session_state["solve_job_info"]
+        result, metrics = job.result()
+        if not job.cancelled:
+            get_solve_cache().store(data, solver_name, result, metrics)
+        if trace is not None:
+            st.session_state["trace"] = (trace, summarize(trace.events()))
+        Board.__finish_solve(result, metrics, success_message)
+
+    @staticmethod
+    def __finish_solve(result, metrics, success_message):
         if result is None:
             st.error(metrics or "Solver failed.")
             return
@@ -102,7 +166,7 @@ class Board:
 
         keys = list(st.session_state.keys())
         for k in keys:
-            if k not in ["solution", "board_size", "reload_trigger", "metrics"]:
+            if k not in ["solution", "board_size", "reload_trigger", "metrics", "trace", "record_trace"]:
                 del st.session_state[k]
 
         st.success(success_message)
@@ -112,6 +176,9 @@ class Board:
     def __collect_data(self):
         n = self.n
         data = {"n": n, "clues": {"top": [], "bottom": [], "left": [], "right": []}, "grid": []}
+        # cells still showing the previous solution are output, not givens; sending them would also
+        # make every repeated solve miss the solve cache
+        shown = st.session_state.get("solution", {})
 
         for c in range(n):
             data["clues"]["top"].append(st.session_state.get(f"top_{c}", ""))
@@ -119,17 +186,49 @@ class Board:
             data["clues"]["left"].append(st.session_state.get(f"left_{r}", ""))
             row = []
             for c in range(n):
-                row.append(st.session_state.get(f"cell_{r}_{c}", ""))
+                value = st.session_state.get(f"cell_{r}_{c}", "")
+                row.append("" if (r, c) in shown and value == str(shown[(r, c)]) else value)
             data["grid"].append(row)
             data["clues"]["right"].append(st.session_state.get(f"right_{r}", ""))
         for c in range(n):
             data["clues"]["bottom"].append(st.session_state.get(f"bottom_{c}", ""))
         return data
 
+    @staticmethod
+    def __render_trace():
+        entry = st.session_state.get("trace")
+        if entry is None:
+            return
+        trace, summary = entry
+        st.subheader(f"Solver trace ({trace.solver})")
+        st.write("  |  ".join(f"{k.replace('_', ' ')}: {v}" for k, v in summary.items()))
+        kept = trace.count - trace.dropped
+        if kept < 2:
+            return
+        if trace.dropped:
+            st.caption(f"The trace buffer kept the latest {kept} of {trace.count} events; the replay starts from an "
+                       f"empty board.")
+        step = st.slider("Replay step", 1, kept, kept, key="trace_step")
+        # events are streamed up to the chosen step, never copied out of the buffer as a whole
+        event, grid = None, None
+        for event, grid in itertools.islice(replay(trace.events(), trace.n), step):
+            pass
+        st.write(describe(event))
+        st.table([[v or "" for v in row] for row in grid])
+
     @staticmethod
     def __render_metrics():
         metrics = st.session_state.get("metrics")
         if metrics:
             st.subheader("Performance Metrics")
-            for key, value in metrics.items():
-                st.write(f"{key.replace('_', ' ').capitalize()}: {value}")
\ No newline at end of file
+            # the figures every solver reports come first so runs stay comparable across algorithms
+            common = [k for k in ("runtime_sec", "nodes_expanded", "nodes_generated") if k in metrics]
+            common += [k for k in metrics if k.startswith("phase_")]
+            for key in common + [k for k in metrics if k not in common]:
+                st.write(f"{key.replace('_', ' ').capitalize()}: {metrics[key]}")
+
+            stats = get_solve_cache().stats()
+            if stats["hit_rate"] is not None:
+                st.caption(f"Solve cache (all sessions): {stats['hit_rate']:.0%} hit rate, "
+                           f"{stats['hits']} hits / {stats['misses']} misses, {stats['entries']} entries, "
+                           f"{stats['bytes'] / 1024:.0f} KiB")
\ No newline at end of file
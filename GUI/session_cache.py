@@ -0,0 +1,140 @@
+import json
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+import streamlit as st
+
+from CluesGenerator.clues_generator import RandomPuzzleGenerator
+
+# upper bound on the serialized size of all cached solves, shared by every session
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+# pre-generated puzzles kept ready per board size
+WARM_POOL_DEPTH = 8
+
+
+def _normalize(values):
+    return tuple(int(v) if str(v).strip().isdigit() else 0 for v in values)
+
+
+def solve_key(data, algorithm):
+    clues = data["clues"]
+    grid = tuple(_normalize(row) for row in data.get("grid", ()))
+    return (data["n"], algorithm, _normalize(clues["top"]), _normalize(clues["bottom"]),
+            _normalize(clues["left"]), _normalize(clues["right"]), grid)
+
+
+class SolveCache:
+    """
+    LRU of finished GUI solves keyed by (n, algorithm, normalized clues and givens). Entries are
+    weighed by their JSON size and the least recently used ones go once max_bytes is exceeded.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def lookup(self, data, algorithm):
+        start = time.perf_counter()
+        key = solve_key(data, algorithm)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+
+        solution, metrics, _ = entry
+        return solution, {
+            **metrics,
+            "runtime_sec": round(time.perf_counter() - start, 6),
+            "cached_runtime_sec": metrics.get("runtime_sec"),
+            "cache_hit": True,
+        }
+
+    def store(self, data, algorithm, solution, metrics):
+        if solution is None:
+            return
+        size = len(json.dumps(metrics, default=str)) + 8 * len(solution)
+        if size > self.__max_bytes:
+            return
+        key = solve_key(data, algorithm)
+        with self.__lock:
+            previous = self.__entries.pop(key, None)
+            if previous is not None:
+                self.__bytes -= previous[2]
+            # boards are immutable, so the solver's own result is cached as is
+            self.__entries[key] = (solution, dict(metrics), size)
+            self.__bytes += size
+            while self.__bytes > self.__max_bytes:
+                _, (_, _, evicted) = self.__entries.popitem(last=False)
+                self.__bytes -= evicted
+
+    def stats(self):
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "hit_rate": self.__hits / lookups if lookups else None,
+                "entries": len(self.__entries),
+                "bytes": self.__bytes,
+            }
+
+
+class PuzzlePool:
+    """Pre-generated clue sets per board size; a background thread refills a size after each take."""
+
+    def __init__(self, depth=WARM_POOL_DEPTH):
+        self.__depth = depth
+        self.__pools = {}
+        self.__refilling = set()
+        self.__lock = threading.Lock()
+
+    def take(self, n):
+        with self.__lock:
+            pool = self.__pools.setdefault(n, deque())
+            clues = pool.popleft() if pool else None
+        if clues is None:
+            clues = RandomPuzzleGenerator(n, seed=random.getrandbits(64)).generate()
+        self.warm(n)
+        return clues
+
+    def warm(self, n):
+        with self.__lock:
+            if n in self.__refilling or len(self.__pools.get(n, ())) >= self.__depth:
+                return
+            self.__refilling.add(n)
+        threading.Thread(target=self.__refill, args=(n,), daemon=True).start()
+
+    def __refill(self, n):
+        # a private RNG: refilling draws one seed from the global RNG instead of one value per cell
+        generator = RandomPuzzleGenerator(n, seed=random.getrandbits(64))
+        try:
+            while True:
+                with self.__lock:
+                    pool = self.__pools.setdefault(n, deque())
+                    if len(pool) >= self.__depth:
+                        return
+                clues = generator.generate()
+                with self.__lock:
+                    pool.append(clues)
+        finally:
+            with self.__lock:
+                self.__refilling.discard(n)
+
+
+@st.cache_resource
+def get_solve_cache():
+    return SolveCache()
+
+
+@st.cache_resource
+def get_puzzle_pool():
+    return PuzzlePool()
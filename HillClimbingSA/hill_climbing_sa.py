@@ -1,24 +1,70 @@
 import random
 import math
-import time
 from typing import Dict, List, Tuple, Optional
 from collections import deque
 
-from SharedFunctions.shared_functions import visible_count
+from SharedFunctions.board import CompactBoard
+from SharedFunctions.line_kernel import line_visibility
+from SharedFunctions.instrumentation import Instrumentation
+from SharedFunctions.trace import MOVE, PERTURB, SET
 
 
 class HillClimbSolver:
     @staticmethod
-    def solve(data: dict) -> Tuple[Optional[Dict[Tuple[int, int], int]], Dict[str, object]]:
-        solver = HillClimbSolver(data)
-        return solver.__run()
+    def solve(data: dict, deadline=None, facts=None, instrumentation=None) -> Tuple[Optional[CompactBoard], Dict[str, object]]:
+        inst = instrumentation or Instrumentation()
+        solver = HillClimbSolver(data, deadline, facts, inst)
+        inst.start()
+        with inst.phase("search"):
+            success = solver.__run()
+        with inst.phase("result_formatting"):
+            solver.__set_counters()
+            result = solver.__format_result(solver.__best_grid, success)
+        inst.stop()
+        solution, metrics = result
+        metrics.update(inst.metrics())
+        if solver.__timed_out:
+            return None, {"error": deadline.reason(), "timed_out": True, **metrics}
+        return solution, metrics
 
-    def __init__(self, data: dict):
-        self.__start_time = time.time()
+    @staticmethod
+    def best_grid(data: dict, deadline=None, facts=None, instrumentation=None,
+                  max_restarts: Optional[int] = None) -> Tuple[Optional[List[List[int]]], float, Dict[str, object]]:
+        """
+        Run the local search and return (best grid found, its score, metrics) whether or not it
+        solved the puzzle; a score of 0 means solved. Used as the starting point of the LNS hybrid.
+        """
+        inst = instrumentation or Instrumentation()
+        solver = HillClimbSolver(data, deadline, facts, inst)
+        if max_restarts is not None:
+            solver.__max_restarts = max_restarts
+        inst.start()
+        with inst.phase("search"):
+            solver.__run()
+        solver.__set_counters()
+        inst.stop()
+        metrics = {"solver": "HillClimb", "final_score": solver.__best_score, "success": solver.__best_score == 0,
+                   "timed_out": solver.__timed_out, **inst.metrics()}
+        return solver.__best_grid, solver.__best_score, metrics
+
+    def __init__(self, data: dict, deadline=None, facts=None, instrumentation=None):
         self.__data = data
+        self.__deadline = deadline
+        self.__inst = instrumentation or Instrumentation()
+        self.__trace = self.__inst.trace
         self.__n: int = int(data["n"])
         self.__clues = data["clues"]
 
+        # fixed cells (clue facts and nonzero givens) are placed once and never swapped; moves only
+        # touch free columns of a row
+        self.__fixed: Dict[Tuple[int, int], int] = dict(facts.fixed) if facts is not None else {}
+        for r, row in enumerate(data.get("grid", ())):
+            for c, x in enumerate(row):
+                if str(x).isdigit() and int(x):
+                    self.__fixed[(r, c)] = int(x)
+        self.__free_cols = [[c for c in range(self.__n) if (r, c) not in self.__fixed] for r in range(self.__n)]
+        self.__movable_rows = [r for r in range(self.__n) if len(self.__free_cols[r]) >= 2]
+
         self.__max_restarts = 12
         self.__max_iters_per_restart = max(2000, 250 * self.__n)
         self.__patience = 500
@@ -38,15 +84,24 @@ class HillClimbSolver:
 
         self.__iterations = 0
         self.__restarts = 0
+        self.__moves_evaluated = 0
+        self.__timed_out = False
         self.__best_score = float("inf")
         self.__best_grid: Optional[List[List[int]]] = None
 
-    def __run(self) -> Tuple[Optional[Dict[Tuple[int, int], int]], Dict[str, object]]:
+    def __run(self) -> bool:
+        trace = self.__trace
+        if trace is not None:
+            trace.start(self.__n, "HillClimb")
         for restart in range(self.__max_restarts):
             self.__restarts += 1
 
             # initialize grid and tabu
             grid = self.__random_initial_grid()
+            if trace is not None:
+                for r, row in enumerate(grid):
+                    for c, v in enumerate(row):
+                        trace.record(SET, r, c, v)
             tabu = deque(maxlen=self.__tabu_size)   # stores normalized swap keys (r,c1,c2)
             tabu_set = set()
 
@@ -55,13 +110,25 @@ class HillClimbSolver:
                 self.__update_best(grid, score)
 
             if score == 0:
-                return self.__format_result(self.__best_grid, True)
+                return True
+
+            if not self.__movable_rows:
+                break
 
             iters_since_improve = 0
             max_it = self.__max_iters_per_restart
 
             for it in range(max_it):
                 self.__iterations += 1
+
+                # cheap cooperative deadline check and progress snapshot, amortised over 256 iterations
+                if not (self.__iterations & 0xFF):
+                    self.__inst.progress(nodes_expanded=self.__iterations, nodes_generated=self.__moves_evaluated,
+                                         restarts=self.__restarts, best_score=self.__best_score)
+                    if self.__deadline is not None and self.__deadline.expired():
+                        self.__timed_out = True
+                        return False
+
                 frac = it / max(1, max_it - 1)
                 temp = max(self.__final_temp, self.__initial_temp * (1 - frac))
 
@@ -82,8 +149,8 @@ class HillClimbSolver:
                     iters_since_improve = 0
                     continue
 
-                r = random.randrange(self.__n)
-                c1, c2 = random.sample(range(self.__n), 2)
+                r = random.choice(self.__movable_rows)
+                c1, c2 = random.sample(self.__free_cols[r], 2)
 
                 # normalize swap key so c1 < c2 for consistency
                 a_c1, a_c2 = (c1, c2) if c1 < c2 else (c2, c1)
@@ -91,6 +158,7 @@ class HillClimbSolver:
 
                 # compute delta for the candidate swap
                 delta = self.__delta_swap_row(grid, r, c1, c2)
+                self.__moves_evaluated += 1
 
                 # tabu: if swap is in tabu_set and move is non-improving, skip it
                 if swap_key in tabu_set and delta >= 0:
@@ -121,6 +189,8 @@ class HillClimbSolver:
                     # perform swap
                     grid[r][c1], grid[r][c2] = grid[r][c2], grid[r][c1]
                     score += delta
+                    if trace is not None:
+                        trace.record(MOVE, r, c1, c2, score, temp)
 
                     # push swap into tabu (normalized)
                     tabu.append(swap_key)
@@ -143,7 +213,7 @@ class HillClimbSolver:
 
                 # global success check
                 if self.__best_score == 0:
-                    return self.__format_result(self.__best_grid, True)
+                    return True
 
                 # if stagnation persists, break and restart (but allow a few restarts)
                 if iters_since_improve > self.__patience:
@@ -151,15 +221,16 @@ class HillClimbSolver:
 
             # end of one restart loop
 
-        success = self.__best_score == 0
-        return self.__format_result(self.__best_grid, success)
+        return self.__best_score == 0
 
     def __random_initial_grid(self) -> List[List[int]]:
-        base = list(range(1, self.__n + 1))
         grid: List[List[int]] = []
-        for _ in range(self.__n):
-            row = base[:]
-            random.shuffle(row)
+        for r in range(self.__n):
+            row = [self.__fixed.get((r, c), 0) for c in range(self.__n)]
+            free_values = [v for v in range(1, self.__n + 1) if v not in row]
+            random.shuffle(free_values)
+            for c, v in zip(self.__free_cols[r], free_values):
+                row[c] = v
             grid.append(row)
         return grid
 
@@ -169,13 +240,25 @@ class HillClimbSolver:
         slightly (perform some random swaps inside the row). Keeps rows as permutations.
         """
         n = self.__n
+        if not self.__movable_rows:
+            return
         for _ in range(strength):
-            r = random.randrange(n)
+            r = random.choice(self.__movable_rows)
             # perform a few random swaps inside the chosen row
             swaps = max(1, n // 4)
             for _ in range(swaps):
-                c1, c2 = random.sample(range(n), 2)
+                c1, c2 = random.sample(self.__free_cols[r], 2)
                 grid[r][c1], grid[r][c2] = grid[r][c2], grid[r][c1]
+                if self.__trace is not None:
+                    self.__trace.record(PERTURB, r, c1, c2)
+
+    def __set_counters(self) -> None:
+        self.__inst.set_counters(
+            nodes_expanded=self.__iterations,
+            nodes_generated=self.__moves_evaluated,
+            iterations=self.__iterations,
+            restarts=self.__restarts,
+        )
 
     def __update_best(self, grid: List[List[int]], score: float) -> None:
         self.__best_score = score
@@ -194,16 +277,12 @@ class HillClimbSolver:
 
         clue_penalty = 0
         for r in range(self.__n):
-            row = grid[r]
-            left_vis = visible_count(row)
-            right_vis = visible_count(reversed(row))
+            left_vis, right_vis = line_visibility(grid[r])
             clue_penalty += abs(left_vis - int(self.__clues["left"][r]))
             clue_penalty += abs(right_vis - int(self.__clues["right"][r]))
 
         for c in range(self.__n):
-            col = [grid[r][c] for r in range(self.__n)]
-            top_vis = visible_count(col)
-            bottom_vis = visible_count(reversed(col))
+            top_vis, bottom_vis = line_visibility([grid[r][c] for r in range(self.__n)])
             clue_penalty += abs(top_vis - int(self.__clues["top"][c]))
             clue_penalty += abs(bottom_vis - int(self.__clues["bottom"][c]))
 
@@ -251,12 +330,10 @@ class HillClimbSolver:
 
         # row visibility delta
         row = grid[r][:]
-        left_before = visible_count(row)
-        right_before = visible_count(reversed(row))
+        left_before, right_before = line_visibility(row)
 
         row[c1], row[c2] = row[c2], row[c1]
-        left_after = visible_count(row)
-        right_after = visible_count(reversed(row))
+        left_after, right_after = line_visibility(row)
 
         delta += 1.5 * (abs(left_after - int(self.__clues["left"][r])) +
                         abs(right_after - int(self.__clues["right"][r])) -
@@ -268,10 +345,8 @@ class HillClimbSolver:
             col_before = [grid[rr][c] if rr != r else val_before for rr in range(n)]
             col_after = [grid[rr][c] if rr != r else val_after for rr in range(n)]
 
-            top_before = visible_count(col_before)
-            bottom_before = visible_count(reversed(col_before))
-            top_after = visible_count(col_after)
-            bottom_after = visible_count(reversed(col_after))
+            top_before, bottom_before = line_visibility(col_before)
+            top_after, bottom_after = line_visibility(col_after)
 
             delta += 1.5 * ((abs(top_after - int(self.__clues["top"][c])) +
                              abs(bottom_after - int(self.__clues["bottom"][c]))) -
@@ -280,11 +355,9 @@ class HillClimbSolver:
 
         return delta
 
-    def __format_result(self, grid: Optional[List[List[int]]], success: bool) -> Tuple[Optional[Dict[Tuple[int, int], int]], Dict[str, object]]:
+    def __format_result(self, grid: Optional[List[List[int]]], success: bool) -> Tuple[Optional[CompactBoard], Dict[str, object]]:
         metrics = {
-            "runtime_sec": round(time.time() - self.__start_time, 4),
-            "iterations": self.__iterations,
-            "restarts": self.__restarts,
+            "solver": "HillClimb",
             "final_score": None if self.__best_score == float("inf") else self.__best_score,
             "success": bool(success),
             "n": self.__n,
@@ -293,9 +366,4 @@ class HillClimbSolver:
         if not success or grid is None:
             return None, metrics
 
-        solution: Dict[Tuple[int, int], int] = {}
-        for r in range(self.__n):
-            for c in range(self.__n):
-                solution[(r, c)] = int(grid[r][c])
-
-        return solution, metrics
\ No newline at end of file
+        return CompactBoard.from_grid(grid), metrics
\ No newline at end of file
@@ -0,0 +1,270 @@
+import itertools
+import random
+
+from CSP_AC3.csp_solver import CSPSolver
+from Controller.preprocessing import ClueFacts
+from HillClimbingSA.hill_climbing_sa import HillClimbSolver
+from SharedFunctions.board import CompactBoard
+from SharedFunctions.deadline import Deadline, DeadlineExceeded
+from SharedFunctions.instrumentation import Instrumentation
+from SharedFunctions.line_kernel import candidate_lines, line_visibility
+
+# restarts of the local search that provides the first incumbent
+LOCAL_SEARCH_RESTARTS = 3
+# lines freed by the first neighbourhood; it grows by one line per failed repair
+INITIAL_NEIGHBOURHOOD = 2
+# time cap for one repair, unless the neighbourhood is the whole board
+REPAIR_BUDGET_SEC = 2.0
+# a line that is not freed keeps its clue relaxed while it has at most this many free cells
+# (its candidates are the permutations of its free values); beyond that its clue is enforced
+RELAX_MAX_FREE = 5
+
+DIRECTIONS = ("top", "bottom", "left", "right")
+
+
+class LNSSolver:
+    """
+    Large-neighbourhood search: HillClimb's best grid is the incumbent. Each step frees a few rows
+    and columns chosen around the violated clues and column duplicates, keeps every other cell
+    fixed, and lets CSPSolver fill the freed cells exactly, with the Latin constraints everywhere
+    and the clues of the freed lines. A repair that lowers the violation score becomes the new
+    incumbent and the neighbourhood shrinks again; otherwise it grows. Once it covers the whole
+    board the repair is a plain exact CSP solve, so the search ends either way.
+    """
+
+    def __init__(self, data, deadline=None, facts=None, instrumentation=None):
+        n = int(data["n"])
+        self.__n = n
+        self.__data = data
+        self.__clues = {d: [int(x) for x in data["clues"][d]] for d in DIRECTIONS}
+        self.__deadline = deadline or Deadline()
+        self.__facts = facts
+        self.__inst = instrumentation or Instrumentation()
+        self.__givens = [
+            [int(x) if str(x).isdigit() else 0 for x in row]
+            for row in data.get("grid", [[0] * n for _ in range(n)])
+        ]
+        self.__lines = [("row", i) for i in range(n)] + [("col", i) for i in range(n)]
+
+        self.__local_iterations = 0
+        self.__local_moves = 0
+        self.__repair_nodes = 0
+        self.__repair_generated = 0
+        self.__attempts = 0
+        self.__successes = 0
+        self.__sizes = []
+        self.__freed_lines = []
+        self.__initial_score = None
+        self.__score = None
+
+    def __cells(self, key):
+        kind, i = key
+        if kind == "row":
+            return [(i, c) for c in range(self.__n)]
+        return [(r, i) for r in range(self.__n)]
+
+    def __line_clues(self, key):
+        kind, i = key
+        if kind == "row":
+            return self.__clues["left"][i], self.__clues["right"][i]
+        return self.__clues["top"][i], self.__clues["bottom"][i]
+
+    def __evaluate(self, grid):
+        """HillClimb's score (duplicates + 1.5 per unit of clue error) and the lines that break a rule."""
+        score = 0.0
+        violated = []
+        for key in self.__lines:
+            line = [grid[r][c] for r, c in self.__cells(key)]
+            front, back = line_visibility(line)
+            clue_front, clue_back = self.__line_clues(key)
+            error = abs(front - clue_front) + abs(back - clue_back)
+            duplicates = self.__n - len(set(line))
+            if error or duplicates:
+                violated.append(key)
+            score += duplicates + 1.5 * error
+        return score, violated
+
+    def __is_free(self, cell, freed):
+        r, c = cell
+        return not self.__givens[r][c] and (("row", r) in freed or ("col", c) in freed)
+
+    def __neighbourhood(self, grid, violated, size):
+        freed = set(random.sample(violated, min(size, len(violated))))
+        others = [key for key in self.__lines if key not in freed]
+        random.shuffle(others)
+        while len(freed) < size and others:
+            freed.add(others.pop())
+
+        # fixed cells must not clash among themselves: free every line that still repeats a fixed value
+        changed = True
+        while changed:
+            changed = False
+            for key in self.__lines:
+                if key in freed:
+                    continue
+                fixed = [grid[r][c] for r, c in self.__cells(key) if not self.__is_free((r, c), freed)]
+                if len(fixed) != len(set(fixed)):
+                    freed.add(key)
+                    changed = True
+        return freed
+
+    def __domains(self, grid, freed):
+        """Fixed cells keep their value; a free cell may take any value its row and column do not fix."""
+        n = self.__n
+        fixed = {(r, c): grid[r][c] for r in range(n) for c in range(n) if not self.__is_free((r, c), freed)}
+        domains = {}
+        for r in range(n):
+            for c in range(n):
+                if (r, c) in fixed:
+                    domains[(r, c)] = frozenset((fixed[(r, c)],))
+                else:
+                    taken = {fixed[cell] for cell in self.__cells(("row", r)) + self.__cells(("col", c))
+                             if cell in fixed}
+                    domains[(r, c)] = frozenset(range(1, n + 1)) - taken
+        return domains
+
+    def __candidates(self, key, domains, freed):
+        """Lines the repair may put here: clue-consistent ones, or any permutation of the free values."""
+        allowed = [domains[cell] for cell in self.__cells(key)]
+        free = [k for k, values in enumerate(allowed) if len(values) != 1 or self.__is_free(self.__cells(key)[k], freed)]
+
+        if key not in freed and len(free) <= RELAX_MAX_FREE:
+            base = [next(iter(values)) if k not in free else 0 for k, values in enumerate(allowed)]
+            values = set(range(1, self.__n + 1)).difference(base)
+            lines = []
+            for perm in itertools.permutations(values):
+                if all(v in allowed[k] for k, v in zip(free, perm)):
+                    line = base[:]
+                    for k, v in zip(free, perm):
+                        line[k] = v
+                    lines.append(tuple(line))
+            return lines, False
+
+        deadline = self.__deadline
+        lines = []
+        for i, line in enumerate(candidate_lines(self.__n, *self.__line_clues(key), deadline)):
+            if not (i & 0xFFF):
+                deadline.check()
+            if all(v in values for v, values in zip(line, allowed)):
+                lines.append(line)
+        return lines, True
+
+    def __repair(self, grid, freed):
+        n = self.__n
+        whole = len(freed) == len(self.__lines)
+        domains = self.__domains(grid, freed)
+        clues = {d: [""] * n for d in DIRECTIONS}
+        lines = {"row": {}, "col": {}}
+        for key in self.__lines:
+            kind, i = key
+            lines[kind][i], enforced = self.__candidates(key, domains, freed)
+            if enforced:
+                front, back = self.__line_clues(key)
+                first, second = ("left", "right") if kind == "row" else ("top", "bottom")
+                clues[first][i], clues[second][i] = front, back
+        sub_grid = [[grid[r][c] if not self.__is_free((r, c), freed) else 0 for c in range(n)] for r in range(n)]
+
+        self.__deadline.check()
+        deadline = self.__deadline.child(None if whole else REPAIR_BUDGET_SEC)
+        result, metrics = CSPSolver.solve({"n": n, "clues": clues, "grid": sub_grid}, deadline,
+                                          ClueFacts(n, domains, lines=lines))
+        self.__repair_nodes += metrics.get("nodes_expanded", 0)
+        self.__repair_generated += metrics.get("nodes_generated", 0)
+        if result is None and self.__deadline.expired():
+            raise DeadlineExceeded(self.__deadline.reason())
+        return result.to_grid() if result is not None else None, whole
+
+    def __local_search(self):
+        # the local search may use part of the budget, so repairs always get their turn
+        remaining = self.__deadline.remaining()
+        budget = None if remaining is None else remaining / 2
+        grid, score, metrics = HillClimbSolver.best_grid(self.__data, self.__deadline.child(budget), self.__facts,
+                                                         max_restarts=LOCAL_SEARCH_RESTARTS)
+        self.__local_iterations = metrics.get("nodes_expanded", 0)
+        self.__local_moves = metrics.get("nodes_generated", 0)
+        self.__deadline.check()
+        return grid
+
+    def __run(self):
+        n = self.__n
+        grid = self.__local_search()
+        size = INITIAL_NEIGHBOURHOOD
+        if grid is None:
+            # no incumbent at all: the first repair is the whole board
+            grid = [row[:] for row in self.__givens]
+            self.__score, violated = float("inf"), list(self.__lines)
+            size = len(self.__lines)
+        else:
+            self.__score, violated = self.__evaluate(grid)
+        self.__initial_score = self.__score
+
+        while self.__score > 0:
+            self.__deadline.check()
+            freed = self.__neighbourhood(grid, violated, size)
+            self.__attempts += 1
+            self.__freed_lines.append(len(freed))
+            self.__sizes.append(sum(1 for r in range(n) for c in range(n) if self.__is_free((r, c), freed)))
+
+            repaired, whole = self.__repair(grid, freed)
+            if repaired is not None:
+                score, new_violated = self.__evaluate(repaired)
+                if score < self.__score:
+                    self.__successes += 1
+                    grid, self.__score, violated = repaired, score, new_violated
+                    size = max(INITIAL_NEIGHBOURHOOD, size - 1)
+                    self.__progress()
+                    continue
+                if score == self.__score:
+                    # sideways: move on, so the next neighbourhood sees a different board
+                    grid, violated = repaired, new_violated
+            elif whole:
+                # the exact solve over the whole board found nothing
+                return None
+            size = min(len(self.__lines), size + 1)
+            self.__progress()
+        return grid
+
+    def __progress(self):
+        self.__inst.progress(nodes_expanded=self.__local_iterations + self.__repair_nodes,
+                             repairs=self.__attempts, best_score=self.__score)
+
+    @staticmethod
+    def solve(data, deadline=None, facts=None, instrumentation=None):
+        inst = instrumentation or Instrumentation()
+        solver = LNSSolver(data, deadline, facts, inst)
+        error = None
+        grid = None
+
+        inst.start()
+        try:
+            with inst.phase("search"):
+                grid = solver.__run()
+        except DeadlineExceeded as e:
+            error = str(e)
+
+        with inst.phase("result_formatting"):
+            result = CompactBoard.from_grid(grid) if grid is not None and solver.__score == 0 else None
+            sizes = solver.__sizes
+            inst.set_counters(
+                nodes_expanded=solver.__local_iterations + solver.__repair_nodes,
+                nodes_generated=solver.__local_moves + solver.__repair_generated,
+                local_search_iterations=solver.__local_iterations,
+                repair_nodes=solver.__repair_nodes,
+                lns_initial_score=solver.__initial_score,
+                lns_final_score=solver.__score,
+                lns_repairs_attempted=solver.__attempts,
+                lns_repairs_succeeded=solver.__successes,
+                lns_repair_success_rate=round(solver.__successes / solver.__attempts, 4) if solver.__attempts else None,
+                lns_neighbourhood_sizes=sizes,
+                lns_neighbourhood_lines=solver.__freed_lines,
+                lns_neighbourhood_mean=round(sum(sizes) / len(sizes), 2) if sizes else None,
+                lns_neighbourhood_max=max(sizes, default=None),
+            )
+        inst.stop()
+        metrics = {"solver": "LNS", "success": result is not None, **inst.metrics()}
+
+        if error is not None:
+            return None, {"error": error, "timed_out": True, **metrics}
+        if result is None:
+            return None, {"error": "No solution found", **metrics}
+        return result, metrics
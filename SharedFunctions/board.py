@@ -0,0 +1,123 @@
+from array import array
+from collections.abc import Mapping
+
+
+class CompactBoard(Mapping):
+    """
+    n x n board stored row-major in one array('B'), 0 meaning an empty cell. It reads like the
+    historical {(r, c): value} solution dict, so existing callers keep working, while rows and
+    columns are memoryview slices and pickling sends n*n bytes. Treat it as immutable: the hash
+    is cached.
+    """
+
+    __slots__ = ("n", "_cells", "_hash")
+
+    def __init__(self, n, cells=None):
+        self.n = n
+        if cells is None:
+            self._cells = array("B", bytes(n * n))
+        else:
+            self._cells = cells if isinstance(cells, array) else array("B", cells)
+            if len(self._cells) != n * n:
+                raise ValueError(f"Expected {n * n} cells, got {len(self._cells)}")
+        self._hash = None
+
+    @classmethod
+    def from_grid(cls, grid):
+        n = len(grid)
+        return cls(n, array("B", [int(v) if v else 0 for row in grid for v in row]))
+
+    @classmethod
+    def from_dict(cls, n, solution):
+        cells = array("B", bytes(n * n))
+        for (r, c), v in solution.items():
+            cells[r * n + c] = v
+        return cls(n, cells)
+
+    # mapping protocol: keys are (r, c) pairs of filled cells
+    def __getitem__(self, key):
+        r, c = key
+        if not (0 <= r < self.n and 0 <= c < self.n):
+            raise KeyError(key)
+        v = self._cells[r * self.n + c]
+        if not v:
+            raise KeyError(key)
+        return v
+
+    def __iter__(self):
+        n = self.n
+        for i, v in enumerate(self._cells):
+            if v:
+                yield divmod(i, n)
+
+    def __len__(self):
+        return len(self._cells) - self._cells.count(0)
+
+    def items(self):
+        n = self.n
+        return [(divmod(i, n), v) for i, v in enumerate(self._cells) if v]
+
+    def __eq__(self, other):
+        if isinstance(other, CompactBoard):
+            return self.n == other.n and self._cells == other._cells
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.n, self._cells.tobytes()))
+        return self._hash
+
+    def __reduce__(self):
+        return CompactBoard, (self.n, self._cells.tobytes())
+
+    def __repr__(self):
+        return f"CompactBoard({self.n}, {self.to_grid()!r})"
+
+    # views
+    def value(self, r, c):
+        return self._cells[r * self.n + c]
+
+    def row(self, r):
+        return memoryview(self._cells)[r * self.n:(r + 1) * self.n]
+
+    def col(self, c):
+        return memoryview(self._cells)[c::self.n]
+
+    def tobytes(self):
+        return self._cells.tobytes()
+
+    # masks: bit v-1 is set when value v is present
+    def row_mask(self, r):
+        return _mask(self.row(r))
+
+    def col_mask(self, c):
+        return _mask(self.col(c))
+
+    def is_complete(self):
+        return 0 not in self._cells
+
+    # conversions, only when a caller asks for them
+    def to_grid(self):
+        n = self.n
+        cells = self._cells
+        return [cells[r * n:(r + 1) * n].tolist() for r in range(n)]
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+def _mask(line):
+    mask = 0
+    for v in line:
+        if v:
+            mask |= 1 << (v - 1)
+    return mask
+
+
+def as_board(n, solution):
+    """CompactBoard for any solution form (board, (r, c) dict or grid); None stays None."""
+    if solution is None or isinstance(solution, CompactBoard):
+        return solution
+    if isinstance(solution, Mapping):
+        return CompactBoard.from_dict(n, solution)
+    return CompactBoard.from_grid(solution)
@@ -0,0 +1,74 @@
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class Deadline:
+    """
+    Cooperative deadline / cancellation token shared between a caller and a solver.
+    Solvers call `check()` (or `expired()`) from their main loops; the caller can
+    stop a running solve at any time with `cancel()`.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, event=None):
+        self.__timeout = timeout
+        self.__expires_at = None if timeout is None else time.monotonic() + timeout
+        self.__cancelled = False
+        # optional externally owned flag (e.g. a multiprocessing.Event) with an is_set() method
+        self.__event = event
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self.__timeout
+
+    def cancel(self) -> None:
+        self.__cancelled = True
+        if self.__event is not None:
+            self.__event.set()
+
+    def cancelled(self) -> bool:
+        return self.__cancelled or (self.__event is not None and self.__event.is_set())
+
+    def expired(self) -> bool:
+        if self.cancelled():
+            return True
+        return self.__expires_at is not None and time.monotonic() >= self.__expires_at
+
+    def remaining(self) -> Optional[float]:
+        if self.__expires_at is None:
+            return None
+        return max(0.0, self.__expires_at - time.monotonic())
+
+    def child(self, timeout: Optional[float] = None) -> "Deadline":
+        """A deadline for one step of a solve: it ends after `timeout` seconds or with this one, whichever is first."""
+        remaining = self.remaining()
+        if timeout is None or (remaining is not None and remaining < timeout):
+            timeout = remaining
+        return Deadline(timeout, _CancelledWith(self))
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded(self.reason())
+
+    def reason(self) -> str:
+        if self.cancelled():
+            return "Cancelled"
+        return f"Timeout after {self.__timeout} seconds"
+
+
+class _CancelledWith:
+    """Event-like view of a parent deadline's cancellation; cancelling the child leaves the parent alone."""
+
+    __slots__ = ("_parent",)
+
+    def __init__(self, parent):
+        self._parent = parent
+
+    def is_set(self):
+        return self._parent.cancelled()
+
+    def set(self):
+        pass
@@ -0,0 +1,122 @@
+import time
+import tracemalloc
+
+PHASES = ("line_generation", "initial_propagation", "search", "result_formatting")
+# counters every solver reports under the same names
+COMMON_COUNTERS = ("nodes_expanded", "nodes_generated")
+
+
+class _PhaseTimer:
+    __slots__ = ("_owner", "_name", "_start")
+
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._owner._add_phase(self._name, time.perf_counter_ns() - self._start)
+        return False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+class Instrumentation:
+    """
+    Shared metrics layer for all solvers: perf_counter_ns phase timers, counters with common
+    names and opt-in tracemalloc peak memory. With enabled=False only the overall wall clock
+    and the counters are kept, so the no-op mode costs two clock reads per solve.
+
+    Solvers also publish live counters with progress() at their amortised deadline checks;
+    another thread reads them with snapshot() while the solve is running. An optional
+    TraceRecorder (SharedFunctions/trace.py) receives their per-step events.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, trace=None):
+        self.__enabled = enabled
+        self.__trace = trace
+        self.__trace_memory = trace_memory and enabled
+        self.__owns_trace = False
+        self.__phases = {}
+        self.__counters = {}
+        self.__start_ns = None
+        self.__end_ns = None
+        self.__memory_peak = None
+        self.__progress = {}
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @property
+    def trace(self):
+        return self.__trace
+
+    def start(self):
+        if self.__trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__owns_trace = True
+        self.__start_ns = time.perf_counter_ns()
+        self.__end_ns = None
+
+    def stop(self):
+        if self.__end_ns is not None:
+            return
+        self.__end_ns = time.perf_counter_ns()
+        if self.__trace_memory and tracemalloc.is_tracing():
+            _, self.__memory_peak = tracemalloc.get_traced_memory()
+            if self.__owns_trace:
+                tracemalloc.stop()
+                self.__owns_trace = False
+
+    def phase(self, name):
+        if not self.__enabled:
+            return _NO_PHASE
+        return _PhaseTimer(self, name)
+
+    def _add_phase(self, name, elapsed_ns):
+        self.__phases[name] = self.__phases.get(name, 0) + elapsed_ns
+
+    def progress(self, **counters):
+        # replaced rather than updated, so a reader never sees a half-written snapshot
+        self.__progress = counters
+
+    def snapshot(self):
+        return {"elapsed_sec": round(self.elapsed_sec(), 3), **self.__progress}
+
+    def set_counters(self, **counters):
+        self.__counters.update(counters)
+
+    def elapsed_sec(self):
+        if self.__start_ns is None:
+            return 0.0
+        end = self.__end_ns if self.__end_ns is not None else time.perf_counter_ns()
+        return (end - self.__start_ns) / 1e9
+
+    def metrics(self):
+        metrics = {"runtime_sec": round(self.elapsed_sec(), 6)}
+        for name in COMMON_COUNTERS:
+            metrics[name] = self.__counters.get(name, 0)
+        for name, value in self.__counters.items():
+            metrics.setdefault(name, value)
+        for name in PHASES:
+            if name in self.__phases:
+                metrics[f"phase_{name}_ms"] = round(self.__phases[name] / 1e6, 3)
+        if self.__memory_peak is not None:
+            metrics["memory_peak_bytes"] = self.__memory_peak
+        return metrics
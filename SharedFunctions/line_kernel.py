@@ -0,0 +1,195 @@
+import itertools
+from array import array
+from heapq import merge
+
+# permutation tables are kept for board sizes up to this n (9! lines, ~5 MB per process)
+TABLE_MAX_N = 9
+# every line of heights 0..n (empty cells and duplicates included) is tabulated up to this length:
+# 6**5 entries, under 1 MB; at n=6 it would be 11 MB, and longer lines are counted directly
+LINE_TABLE_MAX_N = 5
+
+# (front, back) pairs are shared objects, so table entries cost one pointer
+_PAIRS = tuple(tuple((f, b) for b in range(16)) for f in range(16))
+
+_TABLES = {}
+_CANDIDATES = {}
+_LINE_TABLES = {}
+
+
+class PermutationTable:
+    """
+    All permutations of 1..n in lexicographic order, addressed by rank. `lines` packs them
+    n bytes apiece; `forward[rank]` and `backward[rank]` hold the number of visible buildings
+    from the front and from the back, so the reverse direction needs no reversed copy.
+    Ranks are grouped by their (front, back) visibility pair.
+    """
+
+    __slots__ = ("n", "lines", "forward", "backward", "groups")
+
+    def __init__(self, n, deadline=None):
+        self.n = n
+        lines = bytearray()
+        self.forward = bytearray()
+        self.backward = bytearray()
+        groups = {}
+
+        for rank, p in enumerate(itertools.permutations(range(1, n + 1))):
+            if deadline is not None and not (rank & 0xFFF):
+                deadline.check()
+            f, b = _count_both(p, n)
+            lines += bytes(p)
+            self.forward.append(f)
+            self.backward.append(b)
+            group = groups.get((f, b))
+            if group is None:
+                group = groups[(f, b)] = array("I")
+            group.append(rank)
+
+        self.lines = bytes(lines)
+        self.groups = groups
+
+    def __len__(self):
+        return len(self.forward)
+
+    def line(self, rank):
+        n = self.n
+        return self.lines[rank * n:(rank + 1) * n]
+
+    def ranks(self, front=0, back=0):
+        """Ranks of the lines that satisfy the clues, in lexicographic order; 0 means no clue."""
+        fronts = [front] if front else range(1, self.n + 1)
+        backs = [back] if back else range(1, self.n + 1)
+        parts = [self.groups[(f, b)] for f in fronts for b in backs if (f, b) in self.groups]
+        if len(parts) == 1:
+            return parts[0]
+        return array("I", merge(*parts))
+
+
+def _count_both(line, n=0):
+    """Front and back visibility; n > 0 promises n is the tallest height, so each pass stops there."""
+    front = 0
+    tallest = 0
+    for h in line:
+        if h > tallest:
+            tallest = h
+            front += 1
+            if h == n:
+                break
+    back = 0
+    tallest = 0
+    for h in reversed(line):
+        if h > tallest:
+            tallest = h
+            back += 1
+            if h == n:
+                break
+    return front, back
+
+
+def _line_table(n):
+    """bytes(line) -> shared (front, back) pair for every line of length n over heights 0..n."""
+    table = _LINE_TABLES.get(n)
+    if table is None:
+        table = {}
+        for line in itertools.product(range(n + 1), repeat=n):
+            f, b = _count_both(line)
+            table[bytes(line)] = _PAIRS[f][b]
+        _LINE_TABLES[n] = table
+    return table
+
+
+def permutation_table(n, deadline=None):
+    table = _TABLES.get(n)
+    if table is None:
+        if n > TABLE_MAX_N:
+            raise ValueError(f"Permutation tables are only kept for n <= {TABLE_MAX_N}")
+        table = _TABLES[n] = PermutationTable(n, deadline)
+    return table
+
+
+def _clue(value):
+    return int(value) if value not in ("", None) else 0
+
+
+def candidate_lines(n, clue_front, clue_back, deadline=None):
+    """Every permutation line consistent with the two clues ("" or 0 for none), as tuples; cached per process."""
+    front, back = _clue(clue_front), _clue(clue_back)
+    key = (n, front, back)
+    cached = _CANDIDATES.get(key)
+    if cached is not None:
+        return cached
+
+    if n > TABLE_MAX_N:
+        lines = []
+        for i, p in enumerate(itertools.permutations(range(1, n + 1))):
+            if deadline is not None and not (i & 0xFFF):
+                deadline.check()
+            f, b = _count_both(p, n)
+            if (not front or f == front) and (not back or b == back):
+                lines.append(p)
+        cached = _CANDIDATES[key] = tuple(lines)
+        return cached
+
+    table = permutation_table(n, deadline)
+    packed = table.lines
+    cached = _CANDIDATES[key] = tuple(tuple(packed[r * n:(r + 1) * n]) for r in table.ranks(front, back))
+    return cached
+
+
+def line_visibility(line):
+    """
+    (visible from the front, visible from the back) for any line of heights 0..15; zeros are
+    empty cells and never count. Lines up to LINE_TABLE_MAX_N cells are looked up in a table
+    precomputed for every line of their length; longer ones are counted directly, which beats
+    any per-line encoding done in Python and keeps nothing per line in memory.
+    """
+    n = len(line)
+    if n <= LINE_TABLE_MAX_N:
+        table = _LINE_TABLES.get(n) or _line_table(n)
+        pair = table.get(line if type(line) is bytes else bytes(line))
+        if pair is not None:
+            return pair
+    # _count_both inlined: this is the hottest call in HillClimb and A*
+    front = 0
+    tallest = 0
+    for h in line:
+        if h > tallest:
+            tallest = h
+            front += 1
+    back = 0
+    tallest = 0
+    for h in reversed(line):
+        if h > tallest:
+            tallest = h
+            back += 1
+    return front, back
+
+
+def visible_front(line):
+    return line_visibility(line)[0]
+
+
+def visible_back(line):
+    return line_visibility(line)[1]
+
+
+def visibility_batch(lines):
+    """line_visibility over many lines; returns a list of (front, back)."""
+    return [line_visibility(line) for line in lines]
+
+
+def visibility_array(lines):
+    """
+    NumPy version for a (k, n) integer array of lines: returns (front, back) count arrays.
+    The backward pass reads a reversed view, so nothing is copied. Requires numpy.
+    """
+    import numpy as np
+
+    lines = np.asarray(lines)
+
+    def count(view):
+        before = np.zeros_like(view)
+        np.maximum.accumulate(view[:, :-1], axis=1, out=before[:, 1:])
+        return np.count_nonzero(view > before, axis=1)
+
+    return count(lines), count(lines[:, ::-1])
@@ -0,0 +1,130 @@
+"""
+Learned value ordering for the CSP search. The table predicts solution values well, but it can
+only change the order of values CSP branches on, and after preprocessing and AC-3 most held-out
+puzzles (n <= 8) are solved with no or very few backtracks. Effort changes on the few puzzles
+that do branch; see Evaluations/ordering_benchmark.py. A* is not hooked up: its children are
+ranked by heuristic, and the table could only break ties, which changed nothing measurable.
+"""
+import mmap
+import struct
+from array import array
+from functools import lru_cache
+
+# file: header, then one block per n = 1..max_n of three uint32 arrays (chosen, tried, failed),
+# each indexed by (front clue, back clue, position, value); clue 0 means no clue
+HEADER = struct.Struct("<8sB")
+MAGIC = b"SKYORD01"
+MAX_N = 9
+FIELDS = 3
+
+
+def _block_size(n):
+    return (n + 1) * (n + 1) * n * n
+
+
+def _offsets(max_n):
+    offsets = {}
+    offset = HEADER.size
+    for n in range(1, max_n + 1):
+        offsets[n] = offset
+        offset += FIELDS * _block_size(n) * 4
+    return offsets, offset
+
+
+def _index(n, front, back, position, value):
+    return ((front * (n + 1) + back) * n + position) * n + value - 1
+
+
+def _clue(x):
+    return int(x) if x not in ("", None) else 0
+
+
+class OrderingCounts:
+    """Mutable counts for the offline builder; write() stores them in the layout OrderingTable maps."""
+
+    def __init__(self, max_n=MAX_N):
+        self.max_n = max_n
+        self.__counts = {n: [array("I", bytes(4 * _block_size(n))) for _ in range(FIELDS)]
+                         for n in range(1, max_n + 1)}
+
+    def add(self, field, n, front, back, position, value):
+        self.__counts[n][field][_index(n, _clue(front), _clue(back), position, value)] += 1
+
+    def write(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.max_n))
+            for n in range(1, self.max_n + 1):
+                for values in self.__counts[n]:
+                    f.write(values.tobytes())
+
+
+CHOSEN, TRIED, FAILED = range(FIELDS)
+
+
+class OrderingTable:
+    """
+    Value-ordering statistics learned from solved puzzles, memory-mapped read-only. For a line
+    with clue pair (front, back) and a position in it, each value has three counts: how often the
+    solutions put it there (chosen), and how often the CSP search assigned it there (tried) and
+    had to undo it (failed). A cell's score for a value combines its row's and its column's
+    smoothed frequency and success rate; CSP tries high scores first. Sizes the table has no
+    data for score every value alike, which keeps the solver's own order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.max_n = HEADER.unpack_from(self.__map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a value-ordering table")
+        offsets, end = _offsets(self.max_n)
+        if len(self.__map) != end:
+            raise ValueError(f"{path} is truncated")
+        view = memoryview(self.__map)
+        self.__fields = {
+            n: [view[offset + i * _block_size(n) * 4:offset + (i + 1) * _block_size(n) * 4].cast("I")
+                for i in range(FIELDS)]
+            for n, offset in offsets.items()
+        }
+
+    def counts(self, n, front, back, position, value):
+        """(chosen, tried, failed) for a value at a position of a line with this clue pair."""
+        if n not in self.__fields:
+            return 0, 0, 0
+        i = _index(n, _clue(front), _clue(back), position, value)
+        return tuple(field[i] for field in self.__fields[n])
+
+    def __line_score(self, n, front, back, position, value, lines):
+        chosen, tried, failed = self.counts(n, front, back, position, value)
+        frequency = (chosen + 1) / (lines + n)
+        success = (tried - failed + 1) / (tried + 2)
+        return frequency * success
+
+    def cell_scores(self, n, row_clues, col_clues, r, c):
+        """Score per value 1..n (index v - 1) of cell (r, c), from its row (position c) and column (position r)."""
+        row_lines = sum(self.counts(n, *row_clues, c, v)[CHOSEN] for v in range(1, n + 1))
+        col_lines = sum(self.counts(n, *col_clues, r, v)[CHOSEN] for v in range(1, n + 1))
+        return [self.__line_score(n, *row_clues, c, v, row_lines) * self.__line_score(n, *col_clues, r, v, col_lines)
+                for v in range(1, n + 1)]
+
+    def board_scores(self, n, clues):
+        """cell_scores for every cell of a puzzle, keyed by (r, c)."""
+        return {
+            (r, c): self.cell_scores(n, (clues["left"][r], clues["right"][r]), (clues["top"][c], clues["bottom"][c]),
+                                     r, c)
+            for r in range(n) for c in range(n)
+        }
+
+
+@lru_cache(maxsize=None)
+def load_ordering_table(path):
+    """The OrderingTable at `path`, mapped once per process."""
+    return OrderingTable(path)
+
+
+def as_ordering_table(ordering):
+    """An OrderingTable for a table or a path; None stays None."""
+    if ordering is None or isinstance(ordering, OrderingTable):
+        return ordering
+    return load_ordering_table(ordering)
@@ -1,3 +1,6 @@
+from SharedFunctions.board import as_board
+
+
 def visible_count(line):
     count = 0
     max_height = 0
@@ -5,4 +8,28 @@ def visible_count(line):
         if h > max_height:
             max_height = h
             count += 1
-    return count
\ No newline at end of file
+    return count
+
+def verify_solution(n, clues, solution):
+    if not solution:
+        return False
+
+    grid = as_board(n, solution).to_grid()
+    full = set(range(1, n + 1))
+
+    for r in range(n):
+        if set(grid[r]) != full:
+            return False
+    for c in range(n):
+        if {grid[r][c] for r in range(n)} != full:
+            return False
+
+    for i in range(n):
+        row = grid[i]
+        col = [grid[r][i] for r in range(n)]
+        for clue, line in ((clues["left"][i], row), (clues["right"][i], row[::-1]),
+                           (clues["top"][i], col), (clues["bottom"][i], col[::-1])):
+            if clue not in ("", 0) and visible_count(line) != int(clue):
+                return False
+    return True
+
@@ -0,0 +1,132 @@
+from multiprocessing import resource_tracker, shared_memory
+
+from SharedFunctions.board import CompactBoard
+
+# largest board a slot holds; clues are stored padded to this width
+MAX_N = 9
+
+DIRECTIONS = ("top", "bottom", "left", "right")
+
+# slot layout, one byte per field: n | 4 * MAX_N clues (0 = blank) | MAX_N^2 givens | MAX_N^2 solution | status
+_CLUES = 1
+_GIVENS = _CLUES + 4 * MAX_N
+_SOLUTION = _GIVENS + MAX_N * MAX_N
+_STATUS = _SOLUTION + MAX_N * MAX_N
+SLOT_BYTES = _STATUS + 1
+
+PENDING, SOLVED, UNSOLVED = 0, 1, 2
+
+# worker side: the buffer this process last attached to, reused while tasks keep naming it
+_attached = None
+
+
+class SharedPuzzleBuffer:
+    """
+    Fixed-width puzzle slots in one multiprocessing.shared_memory segment. The parent packs
+    puzzles into slots and sends workers only (name, capacity, slot); a worker reads the clues
+    and givens in place and writes its solution back into the same slot, so neither puzzles nor
+    boards are pickled. The creating process unlinks the segment in close().
+    """
+
+    def __init__(self, capacity, name=None):
+        self.capacity = capacity
+        self.__owner = name is None
+        if self.__owner:
+            self.__shm = shared_memory.SharedMemory(create=True, size=max(1, capacity * SLOT_BYTES))
+        else:
+            self.__shm = shared_memory.SharedMemory(name=name)
+        self.__buf = self.__shm.buf
+
+    @property
+    def name(self):
+        return self.__shm.name
+
+    @staticmethod
+    def fits(data):
+        """Whether pack() can hold this puzzle: integer clues and givens on a board of at most MAX_N."""
+        try:
+            n = int(data["n"])
+            values = [int(x) for d in DIRECTIONS for x in data["clues"][d]]
+            values += [int(x) if str(x).strip() else 0 for row in data.get("grid", ()) for x in row]
+        except (KeyError, TypeError, ValueError):
+            return False
+        return 1 <= n <= MAX_N and all(0 <= v <= n for v in values)
+
+    def pack(self, slot, data):
+        n = int(data["n"])
+        buf = self.__buf
+        base = slot * SLOT_BYTES
+        buf[base:base + SLOT_BYTES] = bytes(SLOT_BYTES)
+        buf[base] = n
+        for k, direction in enumerate(DIRECTIONS):
+            start = base + _CLUES + k * MAX_N
+            buf[start:start + n] = bytes(int(x) for x in data["clues"][direction])
+        grid = data.get("grid")
+        if grid:
+            start = base + _GIVENS
+            buf[start:start + n * n] = bytes(int(x) if str(x).strip() else 0 for row in grid for x in row)
+
+    def puzzle(self, slot):
+        """The puzzle dict stored in a slot; "grid" is present only when the slot has givens."""
+        buf = self.__buf
+        base = slot * SLOT_BYTES
+        n = buf[base]
+        clues = {}
+        for k, direction in enumerate(DIRECTIONS):
+            start = base + _CLUES + k * MAX_N
+            clues[direction] = list(buf[start:start + n])
+        data = {"n": n, "clues": clues}
+        givens = buf[base + _GIVENS:base + _GIVENS + n * n]
+        if any(givens):
+            data["grid"] = [list(givens[r * n:(r + 1) * n]) for r in range(n)]
+        return data
+
+    def store(self, slot, board):
+        """Write a worker's result into its slot; None marks the puzzle unsolved."""
+        base = slot * SLOT_BYTES
+        if board is None:
+            self.__buf[base + _STATUS] = UNSOLVED
+            return
+        cells = board.tobytes()
+        self.__buf[base + _SOLUTION:base + _SOLUTION + len(cells)] = cells
+        self.__buf[base + _STATUS] = SOLVED
+
+    def solution(self, slot):
+        """The CompactBoard a worker stored in a slot, or None."""
+        buf = self.__buf
+        base = slot * SLOT_BYTES
+        if buf[base + _STATUS] != SOLVED:
+            return None
+        n = buf[base]
+        return CompactBoard(n, bytes(buf[base + _SOLUTION:base + _SOLUTION + n * n]))
+
+    def close(self):
+        self.__buf = None
+        self.__shm.close()
+        if self.__owner:
+            self.__shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def share_tracker():
+    """
+    Start this process's resource tracker before forking workers. Forked workers then report
+    the segments they attach to the same tracker instead of starting their own, which would
+    warn about "leaked" segments and try to unlink them again when the worker exits.
+    """
+    resource_tracker.ensure_running()
+
+
+def attach(name, capacity):
+    """Worker side: the buffer called `name`, attached once and kept until another buffer is named."""
+    global _attached
+    if _attached is None or _attached.name != name:
+        if _attached is not None:
+            _attached.close()
+        _attached = SharedPuzzleBuffer(capacity, name)
+    return _attached
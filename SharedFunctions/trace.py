@@ -0,0 +1,200 @@
+import struct
+from collections import Counter, namedtuple
+
+# one event: kind, row, column, value (unsigned bytes), then three float32 payload fields
+EVENT = struct.Struct("<BBBBfff")
+EVENT_BYTES = EVENT.size
+HEADER = struct.Struct("<8sH16s")
+MAGIC = b"SKYTRC01"
+
+# CSP: x = search depth (cells assigned)
+ASSIGN, PRUNE, BACKTRACK = 1, 2, 3
+# A*: (r, c) is the cell the expansion branches on, value the number of children; x, y, z = f, g, h
+EXPAND = 4
+# HillClimb: swap of columns c and value in row r; x = score after it, y = temperature
+MOVE, PERTURB = 5, 6
+# HillClimb restarts: one SET per cell of the new grid
+SET = 7
+
+KIND_NAMES = {
+    ASSIGN: "assign", PRUNE: "prune", BACKTRACK: "backtrack", EXPAND: "expand",
+    MOVE: "move", PERTURB: "perturb", SET: "set",
+}
+
+# events kept in memory when no path is given (16 MiB)
+DEFAULT_CAPACITY = 1 << 20
+# events buffered before a file write
+FLUSH_EVENTS = 4096
+
+TraceEvent = namedtuple("TraceEvent", "kind r c value x y z")
+
+
+class TraceRecorder:
+    """
+    Opt-in solver trace. Pass one to Instrumentation(trace=...) (or PuzzleManager(trace=...)) and
+    the solvers record fixed-size binary events into it. Without a path the events go to an
+    in-memory ring buffer that keeps the latest `capacity`; with a path they are appended to a
+    file in FLUSH_EVENTS blocks, and close() writes the rest. Solvers check their trace for None
+    before recording, so an unrecorded solve pays one attribute test per event site.
+    """
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, n=0, solver=""):
+        self.path = path
+        self.n = n
+        self.solver = solver
+        self.__capacity = capacity
+        self.__count = 0
+        self.__file = None
+        self.__header = HEADER.pack(MAGIC, n, solver.encode()[:16])
+        if path is None:
+            self.__buffer = bytearray(capacity * EVENT_BYTES)
+        else:
+            self.__buffer = bytearray(FLUSH_EVENTS * EVENT_BYTES)
+            self.__file = open(path, "wb")
+            self.__file.write(self.__header)
+
+    @property
+    def count(self):
+        """Events recorded so far, including those the ring buffer has overwritten."""
+        return self.__count
+
+    @property
+    def dropped(self):
+        if self.__file is not None:
+            return 0
+        return max(0, self.__count - self.__capacity)
+
+    def start(self, n, solver):
+        """Called by the solver: stamp the board size and solver name into the header."""
+        self.n = n
+        self.solver = solver
+        self.__header = HEADER.pack(MAGIC, n, solver.encode()[:16])
+        if self.__file is not None and self.__file.tell() == HEADER.size and not self.__count:
+            self.__file.seek(0)
+            self.__file.write(self.__header)
+
+    def record(self, kind, r, c, value=0, x=0.0, y=0.0, z=0.0):
+        slot = self.__count % (FLUSH_EVENTS if self.__file is not None else self.__capacity)
+        EVENT.pack_into(self.__buffer, slot * EVENT_BYTES, kind, r, c, value, x, y, z)
+        self.__count += 1
+        if self.__file is not None and slot == FLUSH_EVENTS - 1:
+            self.__file.write(self.__buffer)
+
+    def close(self):
+        if self.__file is not None and not self.__file.closed:
+            pending = self.__count % FLUSH_EVENTS
+            self.__file.write(memoryview(self.__buffer)[:pending * EVENT_BYTES])
+            self.__file.close()
+
+    def events(self):
+        """Recorded events, oldest first: the ring buffer's contents, or the file read back lazily."""
+        if self.__file is not None:
+            self.close()
+            yield from read_trace(self.path)
+            return
+        kept = min(self.__count, self.__capacity)
+        first = self.__count - kept
+        view = memoryview(self.__buffer)
+        for i in range(first, self.__count):
+            slot = i % self.__capacity
+            yield TraceEvent(*EVENT.unpack_from(view, slot * EVENT_BYTES))
+
+    def save(self, path):
+        """Write the buffered events to a trace file that read_trace() can stream."""
+        with open(path, "wb") as f:
+            f.write(self.__header)
+            block = bytearray()
+            for event in self.events():
+                block += EVENT.pack(*event)
+                if len(block) >= FLUSH_EVENTS * EVENT_BYTES:
+                    f.write(block)
+                    block.clear()
+            f.write(block)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_header(path):
+    """(n, solver) stored at the start of a trace file."""
+    with open(path, "rb") as f:
+        magic, n, solver = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a solver trace")
+    return n, solver.rstrip(b"\0").decode()
+
+
+def read_trace(path, block_events=FLUSH_EVENTS):
+    """Stream a trace file's events; only one block of `block_events` is in memory at a time."""
+    read_header(path)
+    with open(path, "rb") as f:
+        f.seek(HEADER.size)
+        while True:
+            block = f.read(block_events * EVENT_BYTES)
+            if not block:
+                return
+            usable = len(block) - len(block) % EVENT_BYTES
+            for fields in EVENT.iter_unpack(block[:usable]):
+                yield TraceEvent(*fields)
+
+
+def replay(events, n, grid=None):
+    """
+    Yield (event, grid) with the board as it stands after each event. The same grid list is
+    updated in place, so copy it to keep a step. Expansions leave the board unchanged: A* keeps
+    many boards open at once and the trace records only where each expansion branches.
+    """
+    grid = [row[:] for row in grid] if grid is not None else [[0] * n for _ in range(n)]
+    for event in events:
+        kind = event.kind
+        if kind in (ASSIGN, SET):
+            grid[event.r][event.c] = event.value
+        elif kind == BACKTRACK:
+            grid[event.r][event.c] = 0
+        elif kind in (MOVE, PERTURB):
+            row = grid[event.r]
+            row[event.c], row[event.value] = row[event.value], row[event.c]
+        yield event, grid
+
+
+def describe(event):
+    """One line of text for an event, as the GUI replay shows it."""
+    name = KIND_NAMES.get(event.kind, str(event.kind))
+    if event.kind == EXPAND:
+        return f"{name} at ({event.r}, {event.c}), {event.value} children, f={event.x:g} g={event.y:g} h={event.z:g}"
+    if event.kind in (MOVE, PERTURB):
+        text = f"{name}: swap columns {event.c} and {event.value} in row {event.r}"
+        return text + (f", score {event.x:g}, temperature {event.y:.3f}" if event.kind == MOVE else "")
+    if event.kind == SET:
+        return f"{name} ({event.r}, {event.c}) = {event.value}"
+    return f"{name} ({event.r}, {event.c}) = {event.value} at depth {int(event.x)}"
+
+
+def summarize(events):
+    """Counts per event kind and the extremes that matter per solver, in one pass over the stream."""
+    counts = Counter()
+    max_depth = 0
+    best_score = None
+    f_range = None
+    for event in events:
+        kind = event.kind
+        counts[kind] += 1
+        if kind in (ASSIGN, PRUNE, BACKTRACK):
+            max_depth = max(max_depth, int(event.x))
+        elif kind == MOVE:
+            best_score = event.x if best_score is None else min(best_score, event.x)
+        elif kind == EXPAND:
+            f_range = (event.x, event.x) if f_range is None else (min(f_range[0], event.x), max(f_range[1], event.x))
+
+    summary = {"events": sum(counts.values())}
+    summary.update({KIND_NAMES.get(kind, str(kind)): count for kind, count in sorted(counts.items())})
+    if max_depth:
+        summary["max_depth"] = max_depth
+    if best_score is not None:
+        summary["best_score"] = best_score
+    if f_range is not None:
+        summary["f_min"], summary["f_max"] = f_range
+    return summary
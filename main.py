@@ -1,19 +1,28 @@
-import streamlit as st
+import sys
 
-from CluesGenerator.clues_generator import RandomPuzzleGenerator
-from Controller.puzzle_manager import PuzzleManager
-from Evaluations.evaluator import Evaluator
-from GUI.board import Board
+# Keep module-level imports to the standard library: worker processes started by the
+# Evaluator and the batch pool may re-import this module, and headless runs must not pay
+# for Streamlit. Everything else is imported by the entry point that needs it.
 
-st.set_page_config(page_title="Skyscrapers Puzzle", layout="centered")
 
-st.title("Skyscrapers Puzzle Input Grid")
-st.subheader("Choose board size")
+def _running_under_streamlit() -> bool:
+    if "streamlit" not in sys.modules:
+        return False
+    try:
+        from streamlit import runtime
+        return runtime.exists()
+    except ImportError:
+        return False
+
+
+def run_gui():
+    from GUI.app import render
+    render()
+
+
+def run_evaluation():
+    from Evaluations.evaluator import Evaluator
 
-if __name__ == "__main__":
-    # board = Board()
-    # board.interface()
-    #
     for i in range(4, 8):
         evaluator = Evaluator(i, 0.5)
         csp_mean, csp_sd, a_star_mean, a_star_sd, hill_mean, hill_sd = evaluator.evaluate_algorithms()
@@ -21,4 +30,51 @@ if __name__ == "__main__":
         print(f"==================== {i} x {i} GRID ====================")
         print("CSP mean: ", csp_mean, " | CSP sd: ", csp_sd)
         print("A* mean: ", a_star_mean, " | A* sd: ", a_star_sd)
-        print("Hill Climbing mean: ", hill_mean, " | Hill Climbing sd: ", hill_sd)
\ No newline at end of file
+        print("Hill Climbing mean: ", hill_mean, " | Hill Climbing sd: ", hill_sd)
+
+
+def run_paired_evaluation(argv):
+    import argparse
+    import json
+    from Evaluations.evaluator import Evaluator
+
+    parser = argparse.ArgumentParser(prog="main.py paired",
+                                     description="Paired solver comparison with adaptive sampling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 5, 6, 7])
+    parser.add_argument("--precision", type=float, default=0.05, help="target CI half-width relative to the mean")
+    parser.add_argument("--min-samples", type=int, default=10)
+    parser.add_argument("--max-samples", type=int, default=300)
+    parser.add_argument("--timeout", type=float, default=180)
+    parser.add_argument("--profile", metavar="DIR", default=None,
+                        help="profile every solve with cProfile and write per-algorithm hot spots to DIR")
+    parser.add_argument("--no-phase-timers", action="store_true",
+                        help="skip per-phase timings inside the solvers")
+    parser.add_argument("--shared-memory", action="store_true",
+                        help="send puzzles and boards to the workers through shared memory instead of pickles")
+    args = parser.parse_args(argv)
+
+    for n in args.sizes:
+        evaluator = Evaluator(n, 0.5, profile_dir=args.profile, phase_timers=not args.no_phase_timers,
+                              shared_memory=args.shared_memory)
+        report = evaluator.evaluate_paired(relative_precision=args.precision, min_samples=args.min_samples,
+                                           max_samples=args.max_samples, timeout_sec=args.timeout)
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv):
+    if argv and argv[0] == "solve":
+        from Controller.batch_cli import main as batch_main
+        return batch_main(argv[1:])
+
+    if argv and argv[0] == "paired":
+        return run_paired_evaluation(argv[1:])
+
+    run_evaluation()
+    return 0
+
+
+if _running_under_streamlit():
+    run_gui()
+elif __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))